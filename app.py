@@ -5,152 +5,608 @@
 # Open: http://127.0.0.1:8000
 
 from __future__ import annotations
-import os, sys, csv, json, pathlib, subprocess
-from typing import Dict, Any, List, Iterable, Tuple
-from flask import Flask, request, jsonify, send_from_directory, Response
+import os, sys, io, csv, gzip, json, time, queue, contextlib, string, hashlib, heapq, operator, pathlib, shutil, subprocess, tempfile, threading
+from typing import Dict, Any, List, Iterable, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, Response, abort, send_file
+from flask.json.provider import DefaultJSONProvider
+from html import escape
+
+try:  # opcional: parser CSV em C++ para o preview
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
+try:  # opcional: br para os assets estáticos (gzip fica sempre disponível)
+    import brotli
+except ImportError:
+    brotli = None
+
+try:  # opcional: gzip/br das respostas dinâmicas (JSON da API, preview HTML)
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:  # opcional: JSON mais rápido nas respostas da API e no SSE
+    import orjson
+except ImportError:
+    orjson = None
 
 HERE = pathlib.Path(__file__).resolve().parent
-PY = sys.executable
 SETTINGS_JSON = HERE / "configs" / "ui_settings.json"
-
-app = Flask(__name__)
+_HERE_STR = str(HERE)
+_HERE_PREFIX = _HERE_STR + os.sep
+
+class OrjsonProvider(DefaultJSONProvider):
+    """request.get_json()/jsonify via orjson (o jresp já o usa diretamente)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+app = Flask(__name__, static_folder=None)  # /static/* é servido da memória (_ASSETS)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app.config["MAX_CONTENT_LENGTH"] = 512 * 1024 * 1024  # uploads (modelos/CSVs grandes) → 413 acima disto
+if Compress is not None:
+    # páginas e /static já vão pré-comprimidas (Content-Encoding definido → o Compress não lhes toca);
+    # streams ficam de fora: SSE não pode ser bufferizado e downloads vão por sendfile
+    app.config.update(
+        COMPRESS_MIMETYPES=["text/html", "application/json", "text/javascript", "text/css"],
+        COMPRESS_LEVEL=5,
+        COMPRESS_STREAMS=False,
+    )
+    Compress(app)
 
 # ----------------------- helpers -----------------------
 
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def jresp(obj: Any, status: int = 200) -> Response:
+    return Response(_dumps(obj), status=status, mimetype="application/json")
+
+def sse_event(obj: Dict[str, Any]) -> bytes:
+    return b"data: " + _dumps(obj) + b"\n\n"
+
+MAX_JSON_BYTES = 256 * 1024  # corpos JSON dos POST /api/* (uploads têm o limite geral da app)
+
+def json_body() -> Dict[str, Any]:
+    """Corpo JSON do pedido (objeto); 400 se vazio/inválido, 413 acima de MAX_JSON_BYTES.
+    Lido do stream com limite: um pedido chunked (sem Content-Length) também não passa do máximo."""
+    if (request.content_length or 0) > MAX_JSON_BYTES:
+        abort(413)
+    buf = bytearray()
+    while len(buf) <= MAX_JSON_BYTES:
+        chunk = request.stream.read(MAX_JSON_BYTES + 1 - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    if len(buf) > MAX_JSON_BYTES:
+        abort(413)
+    try:
+        d = app.json.loads(bytes(buf))
+    except ValueError:
+        abort(400)
+    if not isinstance(d, dict):
+        abort(400)
+    return d
+
+def sse_response(frames: Iterable[bytes]) -> Response:
+    r = Response(frames, mimetype="text/event-stream")
+    # nada de cache nem compressão/buffering por proxies (nginx: X-Accel-Buffering) → cada frame chega logo
+    r.headers["Cache-Control"] = "no-cache, no-transform"
+    r.headers["X-Accel-Buffering"] = "no"
+    return r
+
 def ensure_parent(path: str | pathlib.Path):
     pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
 
-def _proc_env() -> dict:
-    env = os.environ.copy()
-    env["PYTHONUTF8"] = "1"
-    env["PYTHONIOENCODING"] = "utf-8"
-    return env
-
-def run_cmd(args: List[str], cwd: pathlib.Path | None = None) -> Dict[str, Any]:
-    if cwd is None:
-        cwd = HERE
+def safe_join(rel: str) -> str:
+    """Caminho absoluto dentro de HERE a partir de um caminho relativo; 400 se for absoluto
+    ou se sair da raiz (../, ou uma pasta irmã como HERE + "2").
+    Só normalização léxica, sem syscalls: os symlinks NÃO são resolvidos, portanto um link
+    dentro da árvore é seguido para onde apontar (quem o criou lá é que decide)."""
+    if os.path.isabs(rel) or os.path.splitdrive(rel)[0]:
+        abort(400)
+    p = os.path.normpath(os.path.join(_HERE_STR, rel))
+    if not p.startswith(_HERE_PREFIX):
+        abort(400)
+    return p
+
+# cache do /api/list: rel -> (st_mtime_ns de cada pasta visitada, itens)
+# (reescrever um ficheiro existente não muda o mtime da pasta → os jobs limpam o cache)
+_LS_CACHE: Dict[str, Tuple[Dict[str, int], List[Dict[str, Any]]]] = {}
+
+def _dirs_unchanged(dir_mtimes: Dict[str, int]) -> bool:
     try:
-        p = subprocess.run(
-            args, cwd=str(cwd), capture_output=True, text=True,
-            shell=False, env=_proc_env(), encoding="utf-8", errors="replace",
+        return all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items())
+    except OSError:
+        return False
+
+# ---- workers dos scripts: um interpretador quente por script ----
+# Cada script do pipeline tem sempre um processo Python já arrancado (app_worker.py)
+# que importou pandas/numpy e o próprio script e espera pelo próximo job no stdin
+# (o job é só a chamada ao main(argv) do script). Cada processo corre
+# UM job e sai — nada de globais nem código antigo (scripts, src/tennistips) entre
+# jobs, como com um subprocesso novo — e logo a seguir arranca o próximo, que aquece
+# enquanto ninguém precisa dele. O output do job são os fds 1/2 reais do processo:
+# print, logging, extensões em C e subprocessos vão todos parar aos pipes.
+
+WORKER_PY = HERE / "app_worker.py"
+
+# ambiente dos workers, montado uma vez no import e partilhado por todos os Popen
+# (o os.environ do app não muda): mesmo UTF-8 que os subprocessos tinham
+_PROC_ENV: Dict[str, str] = {**os.environ, "PYTHONUTF8": "1", "PYTHONIOENCODING": "utf-8", "PYTHONUNBUFFERED": "1"}
+
+def _pump(stream, name: str, q: queue.Queue) -> None:
+    with stream:
+        for raw in stream:
+            q.put({"event": "log", "stream": name, "line": raw.decode("utf-8", "replace").rstrip("\r\n")})
+
+def _collect(proc: subprocess.Popen, q: queue.Queue) -> None:
+    """Linhas de stdout/stderr como mensagens 'log' na fila; no fim um 'end' com o código."""
+    pumps = [threading.Thread(target=_pump, args=(proc.stdout, "stdout", q), daemon=True),
+             threading.Thread(target=_pump, args=(proc.stderr, "stderr", q), daemon=True)]
+    for t in pumps:
+        t.start()
+    for t in pumps:
+        t.join()
+    q.put({"event": "end", "code": proc.wait()})
+
+class ScriptWorker:
+    """Processo quente para um script (caminho .py) ou módulo (-m); um job por processo."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self._lock = threading.Lock()
+        self._next: subprocess.Popen | None = None
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, str(WORKER_PY), self.target], cwd=_HERE_STR, env=_PROC_ENV,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
         )
-        return {"cmd": args, "code": p.returncode, "stdout": p.stdout, "stderr": p.stderr}
-    except Exception as e:
-        return {"cmd": args, "code": -1, "stdout": "", "stderr": str(e)}
 
-def stream_cmd(args: List[str], cwd: pathlib.Path | None = None) -> Iterable[str]:
-    if cwd is None:
-        cwd = HERE
-    yield f"data: {json.dumps({'event':'start','cmd':args})}\n\n"
+    def _take(self) -> subprocess.Popen:
+        proc, self._next = self._next, None
+        if proc is None or proc.poll() is not None:
+            proc = self._spawn()
+        return proc
+
+    def run(self, argv: List[str], max_lines: int = 64, max_wait: float = 0.05,
+            idle: float | None = None) -> Iterator[List[Dict[str, Any]]]:
+        """Lotes de mensagens 'log' (até max_lines ou max_wait s); o último traz o 'end'.
+        Com idle, um lote vazio sai a cada idle s sem output. Um job de cada vez por script."""
+        with self._lock:
+            done = False
+            q: queue.Queue = queue.Queue()
+            try:
+                proc = self._take()
+                threading.Thread(target=_collect, args=(proc, q), daemon=True).start()
+                proc.stdin.write(_dumps(list(argv)) + b"\n")
+                proc.stdin.close()
+                while not done:
+                    try:
+                        batch = [q.get(timeout=idle)]
+                    except queue.Empty:
+                        yield []
+                        continue
+                    deadline = time.monotonic() + max_wait
+                    done = batch[-1]["event"] == "end"
+                    while not done and len(batch) < max_lines:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            break
+                        try:
+                            batch.append(q.get(timeout=left))
+                        except queue.Empty:
+                            break
+                        done = batch[-1]["event"] == "end"
+                    yield batch
+            except OSError as e:
+                # worker morreu antes de receber o job (o 'end' dele, se vier, é ignorado)
+                done = True
+                yield [{"event": "log", "stream": "stderr", "line": f"worker terminou: {e!r}"},
+                       {"event": "end", "code": -1}]
+            finally:
+                # cliente SSE desligou a meio: o job acaba antes de o próximo poder escrever os mesmos ficheiros
+                while not done:
+                    done = q.get()["event"] == "end"
+                _LS_CACHE.clear()
+                try:
+                    self._next = self._spawn()  # já a aquecer para o próximo job
+                except OSError:
+                    self._next = None
+
+_WORKERS: Dict[str, ScriptWorker] = {}
+_WORKERS_LOCK = threading.Lock()
+
+def worker_for(target: str) -> ScriptWorker:
+    with _WORKERS_LOCK:
+        w = _WORKERS.get(target)
+        if w is None:
+            w = _WORKERS[target] = ScriptWorker(target)
+        return w
+
+def run_cmd(target: str, argv: List[str]) -> Dict[str, Any]:
+    out: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+    code = -1
+    for batch in worker_for(target).run(argv):
+        for msg in batch:
+            if msg["event"] == "log":
+                out[msg["stream"]].append(msg["line"])
+            else:
+                code = msg["code"]
+    return {"cmd": [target, *argv], "code": code,
+            "stdout": "\n".join(out["stdout"]), "stderr": "\n".join(out["stderr"])}
+
+SSE_KEEPALIVE = 15.0  # s sem output até mandar um comentário ": keepalive"
+
+# limite de streams SSE em simultâneo: os restantes recebem "busy" em vez de prender threads à espera do worker
+_SSE_SEM = threading.BoundedSemaphore(max(2, os.cpu_count() or 1))
+
+def stream_cmd(target: str, argv: List[str]) -> Iterable[bytes]:
+    if not _SSE_SEM.acquire(blocking=False):
+        yield sse_event({"event": "error", "message": "busy"})
+        return
     try:
-        p = subprocess.Popen(
-            args, cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-            text=True, bufsize=1, env=_proc_env(), encoding="utf-8", errors="replace",
-        )
-        assert p.stdout is not None
-        for line in p.stdout:
-            yield f"data: {json.dumps({'event':'log','line':line.rstrip()})}\n\n"
-        p.wait()
-        yield f"data: {json.dumps({'event':'end','code':p.returncode})}\n\n"
+        yield from _stream_cmd(target, argv)
+    finally:
+        _SSE_SEM.release()
+
+def _stream_cmd(target: str, argv: List[str]) -> Iterable[bytes]:
+    yield sse_event({"event": "start", "cmd": [target, *argv]})
+    try:
+        for batch in worker_for(target).run(argv, idle=SSE_KEEPALIVE):
+            if not batch:  # job calado: comentário SSE para proxies/browsers não fecharem a ligação
+                yield b": keepalive\n\n"
+                continue
+            # um só yield por lote → uma escrita no socket (logs + end juntos no último)
+            lines = [m["line"] for m in batch if m["event"] == "log"]
+            frame = sse_event({"event": "logs", "lines": lines}) if lines else b""
+            if batch[-1]["event"] == "end":
+                frame += sse_event({"event": "end", "code": batch[-1]["code"]})
+            if frame:
+                yield frame
     except Exception as e:
-        yield f"data: {json.dumps({'event':'error','message':str(e)})}\n\n"
+        yield sse_event({"event": "error", "message": str(e)})
 
 # ----------------------- settings -----------------------
 
+def _settings_mtime() -> int:
+    try:
+        return SETTINGS_JSON.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+# JSON já parseado, válido enquanto o st_mtime_ns do ficheiro não mudar (0 = não existe)
+_SETTINGS_CACHE: Dict[str, Any] = {"mtime": 0, "data": {}}
+
 def read_settings() -> Dict[str, Any]:
-    if SETTINGS_JSON.exists():
-        try:
-            return json.loads(SETTINGS_JSON.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+    mtime = _settings_mtime()
+    if mtime == _SETTINGS_CACHE["mtime"]:
+        return _SETTINGS_CACHE["data"]
+    # um open + fstat: o mtime guardado é o do conteúdo lido (sem corrida entre stat e read)
+    try:
+        with open(SETTINGS_JSON, "rb") as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except FileNotFoundError:
+        mtime, data = 0, {}
+    except (OSError, ValueError):  # JSON inválido / ilegível
+        data = {}
+    _SETTINGS_CACHE.update(mtime=mtime, data=data)
+    return data
+
+# defaults dos campos do pipeline (chave do ui_settings.json → valor); os templates usam ${CHAVE}
+DEFAULTS: Dict[str, Any] = {
+    "fetch_provider": "sofascore_playwright", "fetch_days": 2, "fetch_out": r"data\fixtures\latest.csv",
+    "prep_src": r"data\fixtures\latest.csv", "prep_out": r"data\fixtures\latest_for_tips.csv",
+    "tips_hist": "data/processed/matches.csv", "tips_fx": "data/fixtures/latest_for_tips.csv",
+    "tips_cfg": "configs/default.yaml", "tips_model": "models/model.joblib", "tips_out": "outputs/tips.csv",
+    # Parte 4
+    "flt_src": "outputs/tips.csv", "flt_out": "outputs/tips_filtered.csv", "flt_news": "",
+    "flt_minprob": 0.60, "flt_penalty": 0.35, "flt_halflife": 7,
+    # Totals
+    "tot_src": "outputs/tips.csv", "tot_out": "outputs/totals.csv", "tot_lines": "20.5,21.5,22.5,23.5",
+    "tot_side": "over", "tot_tour": "both", "tot_comp": "outros", "tot_minprob": 0.60,
+}
+
+def _nval(v: Any, d: Any) -> str:
+    """numérico: números passam direto; texto só se for número válido, senão o default"""
+    if isinstance(v, (int, float)):
+        return str(v)
+    try:
+        float(v)
+        return v
+    except (TypeError, ValueError):
+        return str(d)
+
+def settings_ctx() -> Dict[str, str]:
+    """Valores prontos para value="..." (texto escapado, números validados), por CHAVE em maiúsculas."""
+    s = read_settings()
+    get = s.get if isinstance(s, dict) else (lambda k, d: d)
+    return {k.upper(): _nval(get(k, d), d) if isinstance(d, (int, float)) else escape(str(get(k, d)))
+            for k, d in DEFAULTS.items()}
 
 def write_settings(obj: Dict[str, Any]):
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
     ensure_parent(SETTINGS_JSON)
-    SETTINGS_JSON.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
+    # temporário único na mesma pasta + os.replace: quem lê nunca vê o ficheiro a meio e
+    # duas gravações em simultâneo (servidor com threads) não partilham o mesmo .tmp
+    fd, tmp = tempfile.mkstemp(dir=SETTINGS_JSON.parent, prefix=SETTINGS_JSON.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, SETTINGS_JSON)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    # invalidação explícita: em FS com mtime grosseiro duas escritas seguidas podem ter o mesmo mtime
+    _SETTINGS_CACHE.update(mtime=-1, data={})
 
 # ----------------------- API: info & files -----------------------
 
+_HEALTH_BODY = _dumps({"status":"ok","cwd":str(HERE),"python":sys.version.split(" ")[0]})  # constante
+
 @app.get("/api/health")
 def api_health():
-    return jsonify({"status":"ok","cwd":str(HERE),"python":sys.version.split(" ")[0]})
+    return Response(_HEALTH_BODY, mimetype="application/json")
+
+def scan_csv(root: str) -> Tuple[Dict[str, int], List[Tuple[int, str, int]]]:
+    """Todos os .csv sob root como (mtime, nome, tamanho) (os.scandir com pilha explícita,
+    um stat por ficheiro) e o st_mtime_ns de cada pasta visitada. FileNotFoundError se root não existir."""
+    cut = len(_HERE_PREFIX)
+    dir_mtimes = {root: os.stat(root).st_mtime_ns}
+    items: List[Tuple[int, str, int]] = []
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:  # pasta removida/sem permissões a meio da listagem
+            continue
+        with it:
+            for e in it:
+                # symlink partido ou entrada apagada entretanto: salta-se essa, não a listagem toda
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        dir_mtimes[e.path] = e.stat(follow_symlinks=False).st_mtime_ns
+                        stack.append(e.path)
+                    elif e.name.endswith(".csv"):
+                        st = e.stat()
+                        items.append((int(st.st_mtime), e.path[cut:], st.st_size))
+                except OSError:
+                    continue
+    return dir_mtimes, items
+
+_BY_MTIME = operator.itemgetter(0)
+LIST_LIMIT = 500  # por pasta, os mais recentes; a UI não precisa de listas de milhares
+_LIST_ROOTS = ("fixtures", "data/fixtures"), ("outputs", "outputs"), ("processed", "data/processed"), ("news", "data/news")
+_NO_FILES: List[Dict[str, Any]] = []  # partilhada (nunca alterada): pasta inexistente
+# corpo JSON da última resposta + as listas de onde veio (mesmos objetos → nada mudou)
+_LIST_BODY: Dict[str, Tuple[tuple, bytes]] = {"last": ((), b"")}
+
+def _ls_hit(rel: str) -> List[Dict[str, Any]] | None:
+    hit = _LS_CACHE.get(rel)
+    if hit is not None and _dirs_unchanged(hit[0]):
+        return hit[1]
+    return None
+
+def ls(rel: str) -> List[Dict[str, Any]]:
+    hit = _ls_hit(rel)
+    if hit is not None:
+        return hit
+    try:
+        dir_mtimes, items = scan_csv(str(HERE / rel))
+    except FileNotFoundError:
+        _LS_CACHE.pop(rel, None)
+        return _NO_FILES
+    top = heapq.nlargest(LIST_LIMIT, items, key=_BY_MTIME)
+    out = [{"name": name, "size": size, "mtime": mtime} for mtime, name, size in top]
+    _LS_CACHE[rel] = (dir_mtimes, out)
+    return out
+
+# pastas disjuntas e trabalho só de syscalls (scandir/stat): threads chegam, o GIL é largado
+_LS_POOL = ThreadPoolExecutor(max_workers=len(_LIST_ROOTS), thread_name_prefix="ls")
 
 @app.get("/api/list")
 def api_list():
-    def ls(rel: str):
-        base = HERE / rel
-        items: List[Dict[str, Any]] = []
-        if base.exists():
-            for p in base.rglob("*.csv"):
-                items.append({"name": str(p.relative_to(HERE)), "size": p.stat().st_size, "mtime": int(p.stat().st_mtime)})
-        return sorted(items, key=lambda x: x["mtime"], reverse=True)
-    return jsonify({
-        "fixtures": ls("data/fixtures"),
-        "outputs": ls("outputs"),
-        "processed": ls("data/processed"),
-        "news": ls("data/news"),
-    })
+    hits = [_ls_hit(rel) for _, rel in _LIST_ROOTS]
+    misses = [i for i, h in enumerate(hits) if h is None]
+    if len(misses) > 1:  # cache fria: percorrer as árvores em paralelo
+        futs = [(i, _LS_POOL.submit(ls, _LIST_ROOTS[i][1])) for i in misses]
+        for i, f in futs:
+            hits[i] = f.result()
+    elif misses:
+        hits[misses[0]] = ls(_LIST_ROOTS[misses[0]][1])
+    lists = tuple(hits)
+    prev, body = _LIST_BODY["last"]
+    if len(prev) != len(lists) or any(a is not b for a, b in zip(lists, prev)):
+        body = _dumps(dict(zip((k for k, _ in _LIST_ROOTS), lists)))
+        _LIST_BODY["last"] = (lists, body)
+    return Response(body, mimetype="application/json")
+
+def _columns_from_rows(rows: Iterable[List[str]], ncols: int, n: int) -> List[List[str]]:
+    data: List[List[str]] = [[] for _ in range(ncols)]
+    for _, row in zip(range(n), rows):
+        for j, col in enumerate(data):
+            col.append(row[j] if j < len(row) else "")
+    return data
+
+_HEAD_CHUNK = 1 << 16
+
+def _csv_head_fast(path: str, n: int) -> Tuple[List[str], List[List[str]]] | None:
+    """Um read de 64 KiB + split, para CSVs simples (sem aspas) cujas n linhas cabem no bloco; senão None."""
+    with open(path, "rb") as f:
+        buf = f.read(_HEAD_CHUNK)
+    lines = buf.decode("utf-8", "replace").split("\n", n + 1)
+    if len(lines) > n + 1:
+        lines.pop()  # resto do bloco
+    elif len(buf) == _HEAD_CHUNK:
+        return None  # n linhas não cabem no bloco (e a última pode estar cortada)
+    elif not lines[-1]:
+        lines.pop()  # depois do último \n não há linha
+    if '"' in "".join(lines):
+        return None
+    if not lines or not lines[0].rstrip("\r"):
+        return [], []
+    cols = lines[0].rstrip("\r").split(",")
+    # linhas em branco contam como linhas vazias, tal como no csv.reader
+    rows = (ln.rstrip("\r").split(",") for ln in lines[1:])
+    return cols, _columns_from_rows(rows, len(cols), n)
+
+def read_csv_head(path: str, n: int, strict: bool = False) -> Tuple[List[str], List[List[str]]]:
+    """Cabeçalho + primeiras n linhas por coluna (tudo como texto). Caminho rápido por split
+    para CSVs simples; senão (ou com strict) pyarrow se existir, csv como recurso."""
+    if not strict and n > 0:
+        fast = _csv_head_fast(path, n)
+        if fast is not None:
+            return fast
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rdr = csv.reader(f)
+        try: cols = next(rdr)
+        except StopIteration: return [], []
+        if pacsv is None or n <= 0:
+            return cols, _columns_from_rows(rdr, len(cols), n)
+    try:
+        reader = pacsv.open_csv(
+            path,
+            read_options=pacsv.ReadOptions(block_size=1 << 20, column_names=cols, skip_rows=1),
+            parse_options=pacsv.ParseOptions(ignore_empty_lines=False),  # linhas em branco como no csv.reader
+            convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in cols}, strings_can_be_null=False),
+        )
+        data: List[List[str]] = [[] for _ in cols]
+        got = 0
+        for batch in reader:
+            batch = batch.slice(0, n - got)
+            for col, arr in zip(data, batch.columns):
+                col.extend(arr.to_pylist())
+            got += batch.num_rows
+            if got >= n:
+                break
+        return cols, data
+    except pa.ArrowInvalid:
+        # linhas irregulares/aspas partidas: o módulo csv é mais tolerante
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rdr = csv.reader(f)
+            next(rdr, None)
+            return cols, _columns_from_rows(rdr, len(cols), n)
+
+def _json_columns(head: bytes, data: List[List[str]]) -> Iterator[bytes]:
+    """{...head, "data": [...]} codificado coluna a coluna; cada coluna é libertada depois de enviada."""
+    yield head[:-1] + b',"data":['
+    data.reverse()
+    sep = b""
+    while data:
+        yield sep + _dumps(data.pop())
+        sep = b","
+    yield b"]}"
+
+def _html_table(cols: List[str], data: List[List[str]]) -> str:
+    """<tr>s do preview já escapados, numa lista + um só join (o browser faz um único parse)."""
+    parts = ["<tr>"]
+    for c in cols:
+        parts += ("<th class='px-3 py-2 bg-neutral-50 dark:bg-neutral-800 sticky top-0 border-b'>", escape(c), "</th>")
+    parts.append("</tr>")
+    for row in zip(*data):
+        parts.append("<tr>")
+        for cell in row:
+            parts += ("<td class='px-3 py-1 border-b'>", escape(cell), "</td>")
+        parts.append("</tr>")
+    return "".join(parts)
 
 @app.get("/api/preview_csv")
 def api_preview_csv():
     path = request.args.get("path")
     n = int(request.args.get("n", 50))
-    if not path: return jsonify({"error":"path is required"}), 400
-    abs_path = (HERE / path).resolve()
-    if not abs_path.exists(): return jsonify({"error": f"file not found: {path}"}), 404
-    rows, cols = [], []
-    with abs_path.open("r", encoding="utf-8", newline="") as f:
-        rdr = csv.reader(f)
-        try: cols = next(rdr)
-        except StopIteration: cols = []
-        for i, row in enumerate(rdr):
-            if i >= n: break
-            rows.append(row)
-    return jsonify({"columns": cols, "rows": rows, "path": str(abs_path.relative_to(HERE))})
+    if not path: return jresp({"error":"path is required"}, 400)
+    abs_path = safe_join(path)
+    if not os.path.isfile(abs_path): return jresp({"error": f"file not found: {path}"}, 404)
+    cols, data = read_csv_head(abs_path, n, strict=request.args.get("strict") == "1")
+    if request.args.get("format") == "html":
+        return jresp({"html": _html_table(cols, data), "path": abs_path[len(_HERE_PREFIX):]})
+    head = _dumps({"columns": cols, "path": abs_path[len(_HERE_PREFIX):]})
+    return Response(_json_columns(head, data), mimetype="application/json")
 
 @app.get("/download/<path:relpath>")
 def download(relpath: str):
-    full = (HERE / relpath).resolve()
-    if not full.exists() or not full.is_file():
+    full = safe_join(relpath)
+    if not os.path.isfile(full):
         return Response("Not found", status=404)
-    return send_from_directory(directory=str(full.parent), path=full.name, as_attachment=True)
+    # conditional=True: ETag/Last-Modified (304) e Range/If-Range (206) para retomar downloads;
+    # o corpo continua a ir por wsgi.file_wrapper (sendfile quando o servidor o suporta)
+    return send_file(full, as_attachment=True, conditional=True, etag=True)
 
 # ----------------------- API: pipeline (sync) -----------------------
 
+# alvos dos workers e partes fixas do argv, montadas uma vez
+FETCH_TARGET = "scripts/fetch_fixtures_sofascore.py"
+PREP_TARGET = "scripts/prep_fixtures_for_tips.py"
+TIPS_TARGET = "src.tennistips.cli"
+FILTER_TARGET = "scripts/filter_tips.py"
+TOTALS_TARGET = "scripts/generate_overunders.py"
+TIPS_PREFIX = ("tips",)
+TOTALS_FIXED = ("--half-life", "7", "--news-gamma", "1.5")  # defaults silenciosos
+
+def filter_argv(src: str, out: str, news: str | None, min_prob: str, penalty: str, half_life: str) -> List[str]:
+    args = [src, out, "--min-prob", min_prob, "--penalty", penalty, "--half-life", half_life]
+    if news:
+        args += ("--news", news)
+    return args
+
+def totals_argv(src: str, out: str, lines: str, side: str, tour: str, comp: str, min_prob: str) -> List[str]:
+    categories, best_of, name_like = comp_to_filters(comp)
+    args = [src, out, "--lines", lines, "--side", side, "--min-prob", min_prob, *TOTALS_FIXED,
+            "--tour", tour, "--categories", categories, "--best-of", best_of]
+    if name_like:
+        args += ("--name-like", name_like)
+    return args
+
 @app.post("/api/fetch")
 def api_fetch():
-    d = request.get_json(force=True)
+    d = json_body()
     provider = d.get("provider", "sofascore_playwright")
     days = str(d.get("days", 2))
     out = d.get("out", r"data\fixtures\latest.csv")
     ensure_parent(out)
-    args = [PY, "scripts/fetch_fixtures_sofascore.py", "--provider", provider, "--days", days, "--out", out]
-    return jsonify(run_cmd(args))
+    args = ["--provider", provider, "--days", days, "--out", out]
+    return jresp(run_cmd(FETCH_TARGET, args))
 
 @app.post("/api/prep")
 def api_prep():
-    d = request.get_json(force=True)
+    d = json_body()
     src = d.get("src", r"data\fixtures\latest.csv")
     out = d.get("out", r"data\fixtures\latest_for_tips.csv")
     ensure_parent(out)
-    args = [PY, "scripts/prep_fixtures_for_tips.py", src, out]
-    return jsonify(run_cmd(args))
+    args = [src, out]
+    return jresp(run_cmd(PREP_TARGET, args))
 
 @app.post("/api/tips")
 def api_tips():
-    d = request.get_json(force=True)
+    d = json_body()
     history = d.get("history", r"data/processed/matches.csv")
     fixtures = d.get("fixtures", r"data/fixtures/latest_for_tips.csv")
     config = d.get("config", r"configs/default.yaml")
     model_path = d.get("model_path", r"models/model.joblib")
     out = d.get("out", r"outputs/tips.csv")
     ensure_parent(out)
-    args = [PY, "-m", "src.tennistips.cli", "tips", "--history", history, "--fixtures", fixtures, "--config", config, "--model-path", model_path, "--out", out]
-    return jsonify(run_cmd(args))
+    args = [*TIPS_PREFIX, "--history", history, "--fixtures", fixtures, "--config", config, "--model-path", model_path, "--out", out]
+    return jresp(run_cmd(TIPS_TARGET, args))
 
 @app.post("/api/filter")
 def api_filter():
-    d = request.get_json(force=True)
+    d = json_body()
     src = d.get("src", r"outputs/tips.csv")
     out = d.get("out", r"outputs/tips_filtered.csv")
     news = d.get("news")
@@ -158,10 +614,7 @@ def api_filter():
     penalty = str(d.get("penalty", 0.35))
     half_life = str(d.get("half_life", 7))
     ensure_parent(out)
-    args = [PY, "scripts/filter_tips.py", src, out, "--min-prob", min_prob, "--penalty", penalty, "--half-life", half_life]
-    if news:
-        args.extend(["--news", news])
-    return jsonify(run_cmd(args))
+    return jresp(run_cmd(FILTER_TARGET, filter_argv(src, out, news, min_prob, penalty, half_life)))
 
 # ----------------------- API: pipeline (SSE) -----------------------
 
@@ -175,35 +628,32 @@ def sse_filter():
     half_life = request.args.get("half_life", "7")
 
     ensure_parent(out)
-    args = [PY, "scripts/filter_tips.py", src, out, "--min-prob", min_prob, "--penalty", penalty, "--half-life", half_life]
-    if news:
-        args.extend(["--news", news])
-    return Response(stream_cmd(args), mimetype='text/event-stream')
+    return sse_response(stream_cmd(FILTER_TARGET, filter_argv(src, out, news, min_prob, penalty, half_life)))
 
 # --------- helper: map “comp” (competição) para filtros de GS/Outros ---------
 
+# competição → (categories, best_of, name_like_regex)
+_COMP_MAP: Dict[str, Tuple[str, str, str]] = {
+    "ausopen": ("gs", "5", r"Australian Open"),
+    "rolandgarros": ("gs", "5", r"Roland Garros"),
+    "wimbledon": ("gs", "5", r"Wimbledon"),
+    "usopen": ("gs", "5", r"US Open"),
+}
+# OUTROS = tudo que não é GS → BO3
+_COMP_DEFAULT = ("1000,500,250,challenger,itf", "3", "")
+
 def comp_to_filters(comp: str) -> Tuple[str, str, str]:
     """
     retorna (categories, best_of, name_like_regex)
     comp: 'outros' | 'ausopen' | 'rolandgarros' | 'wimbledon' | 'usopen'
     """
-    comp = (comp or "outros").lower()
-    if comp == "ausopen":
-        return ("gs", "5", r"Australian Open")
-    if comp == "rolandgarros":
-        return ("gs", "5", r"Roland Garros")
-    if comp == "wimbledon":
-        return ("gs", "5", r"Wimbledon")
-    if comp == "usopen":
-        return ("gs", "5", r"US Open")
-    # OUTROS = tudo que não é GS → BO3
-    return ("1000,500,250,challenger,itf", "3", "")
+    return _COMP_MAP.get((comp or "outros").lower(), _COMP_DEFAULT)
 
 # ----------------------- API: totals (sync) -----------------------
 
 @app.post("/api/totals")
 def api_totals():
-    d = request.get_json(force=True)
+    d = json_body()
     src = d.get("src", r"outputs/tips.csv")
     out = d.get("out", r"outputs/totals.csv")
     lines = d.get("lines", "20.5,21.5,22.5,23.5")
@@ -212,21 +662,8 @@ def api_totals():
     comp = d.get("comp", "outros")        # ausopen | rolandgarros | wimbledon | usopen | outros
     min_prob = str(d.get("min_prob", 0.60))
 
-    # defaults silenciosos
-    half_life = "7"
-    gamma = "1.5"
-
-    categories, best_of, name_like = comp_to_filters(comp)
-
     ensure_parent(out)
-    args = [PY, "scripts/generate_overunders.py", src, out,
-            "--lines", lines, "--side", side,
-            "--min-prob", min_prob, "--half-life", half_life, "--news-gamma", gamma,
-            "--tour", tour, "--categories", categories, "--best-of", best_of]
-    if name_like:
-        args.extend(["--name-like", name_like])
-
-    return jsonify(run_cmd(args))
+    return jresp(run_cmd(TOTALS_TARGET, totals_argv(src, out, lines, side, tour, comp, min_prob)))
 
 # ----------------------- API: totals (SSE) -----------------------
 
@@ -240,64 +677,142 @@ def sse_totals():
     comp = request.args.get("comp", "outros")
     min_prob = request.args.get("min_prob", "0.60")
 
-    half_life = "7"
-    gamma = "1.5"
-
-    categories, best_of, name_like = comp_to_filters(comp)
-
     ensure_parent(out)
-    args = [PY, "scripts/generate_overunders.py", src, out,
-            "--lines", lines, "--side", side,
-            "--min-prob", min_prob, "--half-life", half_life, "--news-gamma", gamma,
-            "--tour", tour, "--categories", categories, "--best-of", best_of]
-    if name_like:
-        args.extend(["--name-like", name_like])
-
-    return Response(stream_cmd(args), mimetype='text/event-stream')
+    return sse_response(stream_cmd(TOTALS_TARGET, totals_argv(src, out, lines, side, tour, comp, min_prob)))
 
 # ----------------------- API: settings & uploads -----------------------
 
 @app.get("/api/get_settings")
 def api_get_settings():
-    return jsonify(read_settings())
+    return jresp(read_settings())
 
 @app.post("/api/save_settings")
 def api_save_settings():
-    data = request.get_json(force=True)
+    data = json_body()
     write_settings(data or {})
-    return jsonify({"ok": True})
+    _PIPELINE_PAGE["mtime"] = _SETTINGS_PAGE["mtime"] = None  # páginas voltam a ser montadas
+    return jresp({"ok": True})
+
+def _on_disk(src) -> bool:
+    """True só se o stream já for um ficheiro em disco. fileno() num SpooledTemporaryFile
+    ainda em memória força o rollover (escreve tudo num temporário) — não se chama."""
+    if isinstance(src, tempfile.SpooledTemporaryFile):
+        return src._rolled
+    return isinstance(src, io.BufferedRandom)
+
+def _copy_upload(src, dst) -> None:
+    """Uploads grandes chegam num ficheiro temporário do werkzeug: sendfile(2) ficheiro→ficheiro
+    sem passar pelo Python; o resto (BytesIO, SpooledTemporaryFile ainda em memória, sem
+    sendfile) vai por cópia em blocos de 1 MiB."""
+    if _on_disk(src) and hasattr(os, "sendfile"):
+        fd = src.fileno()
+        offset = src.tell()
+        try:
+            while True:
+                sent = os.sendfile(dst.fileno(), fd, offset, 1 << 24)
+                if not sent:
+                    return
+                offset += sent
+        except OSError:
+            if offset != src.tell():  # já escreveu parte: não dá para recomeçar com segurança
+                raise
+    shutil.copyfileobj(src, dst, 1 << 20)
 
 @app.post("/api/upload")
 def api_upload():
     f = request.files.get('file')
     dest = request.form.get('dest', '')
     if not f or not dest:
-        return jsonify({"error":"file and dest are required"}), 400
-    abs_dest = (HERE / dest).resolve()
+        return jresp({"error":"file and dest are required"}, 400)
+    abs_dest = safe_join(dest)
     ensure_parent(abs_dest)
-    f.save(str(abs_dest))
-    return jsonify({"ok": True, "saved": str(abs_dest.relative_to(HERE))})
+    # no fim tira o ficheiro da page cache (upload é escrito uma vez e raramente relido)
+    with open(abs_dest, "wb", buffering=0) as dst:
+        _copy_upload(f.stream, dst)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(dst.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    _LS_CACHE.clear()
+    return jresp({"ok": True, "saved": abs_dest[len(_HERE_PREFIX):]})
 
 # ----------------------- UI -----------------------
 
-BASE_CSS = """
-  <script src="https://cdn.tailwindcss.com"></script>
-  <script>tailwind.config={theme:{extend:{colors:{brand:'#0d6efd'}}}}</script>
+APP_JS = """
+const $ = (s)=>document.querySelector(s);
+const setBadge=(ok)=>{const el=$('#health'); if(!el) return; el.textContent= ok?'online':'offline'; el.className='badge '+(ok?'border-green-500 text-green-600':'border-red-500 text-red-600');};
+async function health(){ try{ const r=await fetch('/api/health'); setBadge(r.ok);}catch(e){ setBadge(false);} }
+function initTheme(){ const t=localStorage.getItem('tt_theme'); if(t==='dark') document.documentElement.classList.add('dark'); }
+function activateSidebar(){ const path=location.pathname; document.querySelectorAll('.sidebar a').forEach(a=>{ if(path.startsWith(a.dataset.match)) a.classList.add('active'); }); }
+window.addEventListener('DOMContentLoaded', ()=>{ initTheme(); health(); activateSidebar(); });
+"""
+
+def _asset(body: str, mimetype: str) -> Dict[str, Any]:
+    """Asset servido da memória: bytes crus + versões comprimidas calculadas uma vez."""
+    raw = body.encode("utf-8")
+    enc = {"gzip": gzip.compress(raw, 9, mtime=0)}
+    if brotli is not None:
+        enc["br"] = brotli.compress(raw)
+    return {"mimetype": mimetype, "raw": raw, "enc": enc, "v": hashlib.sha1(raw).hexdigest()[:8]}
+
+# nome simples e nome com hash (app.<v>.js) apontam para o mesmo asset; as páginas usam o com hash
+_ASSETS: Dict[str, Dict[str, Any]] = {}
+
+def add_asset(name: str, body: str, mimetype: str) -> Dict[str, Any]:
+    a = _asset(body, mimetype)
+    stem, _, ext = name.rpartition(".")
+    a["url"] = f"/static/{stem}.{a['v']}.{ext}"
+    _ASSETS[name] = _ASSETS[a["url"].rsplit("/", 1)[1]] = a
+    return a
+
+# componentes (.card, .btn, ...) só em tools/tailwind.in.css. static/app.css = esse ficheiro
+# compilado (node tools/build_css.mjs); sem build vai inline para o compilador do CDN
+# (<style type="text/tailwindcss">: é ele que resolve o @apply, um .css normal não)
+TAILWIND_SRC = HERE / "tools" / "tailwind.in.css"
+TAILWIND_CSS = HERE / "static" / "app.css"
+try:
+    _CSS_TAGS = f'<link rel="stylesheet" href="{add_asset("app.css", TAILWIND_CSS.read_text(encoding="utf-8"), "text/css")["url"]}">'
+except OSError:
+    _CSS_TAGS = f"""<script src="https://cdn.tailwindcss.com"></script>
+  <script>tailwind.config={{theme:{{extend:{{colors:{{brand:'#0d6efd'}}}}}}}}</script>
+  <style type="text/tailwindcss">
+{TAILWIND_SRC.read_text(encoding="utf-8")}  </style>"""
+add_asset("app.js", APP_JS, "text/javascript")
+
+def send_asset(a: Dict[str, Any]) -> Response:
+    """Escolhe br/gzip/identity conforme o Accept-Encoding (sem comprimir nada por pedido)."""
+    body, encoding = a["raw"], None
+    for enc in ("br", "gzip"):
+        if enc in a["enc"] and request.accept_encodings[enc]:
+            body, encoding = a["enc"][enc], enc
+            break
+    r = Response(body, mimetype=a["mimetype"])
+    if encoding:
+        r.content_encoding = encoding
+    r.vary.add("Accept-Encoding")
+    # ETag fraco = hash do conteúdo (igual para todas as codificações) → If-None-Match dá 304 sem corpo
+    r.set_etag(a["v"], weak=True)
+    return r.make_conditional(request)
+
+def script_tag(name: str) -> str:
+    return f'<script src="{_ASSETS[name]["url"]}" defer></script>'
+
+@app.get("/static/<name>")
+def static_asset(name: str):
+    a = _ASSETS.get(name)
+    if a is None:
+        return Response("Not found", status=404)
+    r = send_asset(a)
+    if request.path == a["url"]:
+        # o nome leva o hash do conteúdo, por isso pode ficar em cache "para sempre"
+        r.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        r.headers["Cache-Control"] = "no-cache"  # nome simples: revalidar (ETag → 304)
+    return r
+
+BASE_CSS = f"""
   <link rel="preconnect" href="https://fonts.googleapis.com">
   <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
   <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-  <style>
-    :root{color-scheme:light dark}
-    body{font-family:Inter, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif}
-    .card{ @apply bg-white/90 dark:bg-neutral-900 border border-neutral-200 dark:border-neutral-800 rounded-2xl p-5 shadow-sm; }
-    .btn{ @apply inline-flex items-center gap-2 px-4 py-2 rounded-xl text-sm font-semibold; }
-    .btn-primary{ @apply bg-brand text-white hover:bg-blue-600; }
-    .btn-ghost{ @apply bg-white dark:bg-neutral-800 text-brand border border-brand/30; }
-    .badge{ @apply inline-block text-xs px-2 py-0.5 rounded-full border; }
-    .link{ @apply text-brand underline underline-offset-4; }
-    .sidebar a{ @apply block px-3 py-2 rounded-lg text-sm font-medium hover:bg-brand/10; }
-    .sidebar a.active{ @apply bg-brand/10 text-brand; }
-  </style>
+  {_CSS_TAGS}
 """
 
 NAVBAR = """
@@ -334,27 +849,21 @@ SIDEBAR = """
   </aside>
 """
 
-BASE_JS = """
-  <script>
-    const $ = (s)=>document.querySelector(s);
-    const setBadge=(ok)=>{const el=$('#health'); if(!el) return; el.textContent= ok?'online':'offline'; el.className='badge '+(ok?'border-green-500 text-green-600':'border-red-500 text-red-600');};
-    async function health(){ try{ const r=await fetch('/api/health'); setBadge(r.ok);}catch(e){ setBadge(false);} }
-    function initTheme(){ const t=localStorage.getItem('tt_theme'); if(t==='dark') document.documentElement.classList.add('dark'); }
-    function activateSidebar(){ const path=location.pathname; document.querySelectorAll('.sidebar a').forEach(a=>{ if(path.startsWith(a.dataset.match)) a.classList.add('active'); }); }
-    window.addEventListener('DOMContentLoaded', ()=>{ initTheme(); health(); activateSidebar(); });
-  </script>
+BASE_JS = f"""
+  {script_tag("app.js")}
 """
 
 # ----------------------- pages -----------------------
 
-def layout(content_html: str, title: str = "Dashboard") -> str:
-    return f"""
+# moldura comum pré-montada uma vez: layout() só junta 5 pedaços
+_LAYOUT_HEAD = """
 <!doctype html>
 <html lang=pt>
 <head>
   <meta charset=utf-8>
   <meta name=viewport content="width=device-width, initial-scale=1" />
-  <title>Tennis Tipster • {title}</title>
+  <title>Tennis Tipster • """
+_LAYOUT_BODY = f"""</title>
   {BASE_CSS}
 </head>
 <body class="bg-neutral-100 dark:bg-neutral-950 text-neutral-900 dark:text-neutral-100">
@@ -362,7 +871,8 @@ def layout(content_html: str, title: str = "Dashboard") -> str:
   <main class="max-w-7xl mx-auto px-4 py-6 grid grid-cols-1 lg:grid-cols-[16rem_1fr] gap-6">
     {SIDEBAR}
     <section>
-      {content_html}
+      """
+_LAYOUT_TAIL = f"""
     </section>
   </main>
   {BASE_JS}
@@ -370,23 +880,23 @@ def layout(content_html: str, title: str = "Dashboard") -> str:
 </html>
 """
 
-@app.get("/")
-def home():
-    html = """
+def layout(content_html: str, title: str = "Dashboard") -> str:
+    return "".join((_LAYOUT_HEAD, title, _LAYOUT_BODY, content_html, _LAYOUT_TAIL))
+
+_HOME_PAGE = _asset(layout("""
     <div class=card>
       <h2 class="text-xl font-semibold mb-2">Bem-vindo 👋</h2>
       <p class=text-sm>Use a barra lateral para navegar. Comece em <a class=link href=/pipeline>Pipeline</a>.</p>
     </div>
-    """
-    return layout(html, title="Início")
+    """, title="Início"), "text/html")
 
-# ---------- pipeline ----------
-@app.get("/pipeline")
-def page_pipeline():
-    settings = read_settings() or {}
-    def g(k, v): return str(settings.get(k, v))
+@app.get("/")
+def home():
+    return send_asset(_HOME_PAGE)
 
-    html_tpl = r"""
+# ---------- pipeline ----------
+# template compilado uma vez; a página renderizada fica em cache até o ui_settings.json mudar
+_PIPELINE_TPL = string.Template(r"""
     <div class=card>
       <div class="flex items-center justify-between mb-3">
         <h2 class="font-semibold text-lg">Pipeline</h2>
@@ -398,11 +908,11 @@ def page_pipeline():
         <div class=card>
           <h3 class="font-semibold mb-2">1) Buscar Fixtures</h3>
           <label class=text-xs>Provider</label>
-          <input id=fetch_provider class="w-full border rounded-lg px-3 py-2 mb-2" value="%%FETCH_PROVIDER%%" />
+          <input id=fetch_provider class="w-full border rounded-lg px-3 py-2 mb-2" value="${FETCH_PROVIDER}" />
           <label class=text-xs>Dias</label>
-          <input id=fetch_days type=number class="w-full border rounded-lg px-3 py-2 mb-2" value="%%FETCH_DAYS%%" />
+          <input id=fetch_days type=number class="w-full border rounded-lg px-3 py-2 mb-2" value="${FETCH_DAYS}" />
           <label class=text-xs>Out CSV</label>
-          <input id=fetch_out class="w-full border rounded-lg px-3 py-2 mb-3" value="%%FETCH_OUT%%" />
+          <input id=fetch_out class="w-full border rounded-lg px-3 py-2 mb-3" value="${FETCH_OUT}" />
           <div class="flex gap-2">
             <button id=btnFetch class="btn btn-primary">Executar Fetch</button>
             <button id=btnFetchSSE class="btn btn-ghost">SSE</button>
@@ -414,9 +924,9 @@ def page_pipeline():
         <div class=card>
           <h3 class="font-semibold mb-2">2) Preparar Fixtures</h3>
           <label class=text-xs>Input CSV</label>
-          <input id=prep_src class="w-full border rounded-lg px-3 py-2 mb-2" value="%%PREP_SRC%%" />
+          <input id=prep_src class="w-full border rounded-lg px-3 py-2 mb-2" value="${PREP_SRC}" />
           <label class=text-xs>Out CSV</label>
-          <input id=prep_out class="w-full border rounded-lg px-3 py-2 mb-3" value="%%PREP_OUT%%" />
+          <input id=prep_out class="w-full border rounded-lg px-3 py-2 mb-3" value="${PREP_OUT}" />
           <div class="flex gap-2">
             <button id=btnPrep class="btn btn-primary">Executar Prep</button>
             <button id=btnPrepSSE class="btn btn-ghost">SSE</button>
@@ -428,15 +938,15 @@ def page_pipeline():
         <div class=card>
           <h3 class="font-semibold mb-2">3) Gerar Tips</h3>
           <label class=text-xs>History</label>
-          <input id=tips_hist class="w-full border rounded-lg px-3 py-2 mb-2" value="%%TIPS_HIST%%" />
+          <input id=tips_hist class="w-full border rounded-lg px-3 py-2 mb-2" value="${TIPS_HIST}" />
           <label class=text-xs>Fixtures</label>
-          <input id=tips_fx class="w-full border rounded-lg px-3 py-2 mb-2" value="%%TIPS_FX%%" />
+          <input id=tips_fx class="w-full border rounded-lg px-3 py-2 mb-2" value="${TIPS_FX}" />
           <label class=text-xs>Config</label>
-          <input id=tips_cfg class="w-full border rounded-lg px-3 py-2 mb-2" value="%%TIPS_CFG%%" />
+          <input id=tips_cfg class="w-full border rounded-lg px-3 py-2 mb-2" value="${TIPS_CFG}" />
           <label class=text-xs>Model</label>
-          <input id=tips_model class="w-full border rounded-lg px-3 py-2 mb-3" value="%%TIPS_MODEL%%" />
+          <input id=tips_model class="w-full border rounded-lg px-3 py-2 mb-3" value="${TIPS_MODEL}" />
           <label class=text-xs>Out CSV</label>
-          <input id=tips_out class="w-full border rounded-lg px-3 py-2 mb-3" value="%%TIPS_OUT%%" />
+          <input id=tips_out class="w-full border rounded-lg px-3 py-2 mb-3" value="${TIPS_OUT}" />
           <div class="flex gap-2">
             <button id=btnTips class="btn btn-primary">Executar Tips</button>
             <button id=btnTipsSSE class="btn btn-ghost">SSE</button>
@@ -448,25 +958,25 @@ def page_pipeline():
         <div class=card>
           <h3 class="font-semibold mb-2">4) Filtrar Tips</h3>
           <label class=text-xs>Input CSV</label>
-          <input id=flt_src class="w-full border rounded-lg px-3 py-2 mb-2" value="%%FLT_SRC%%" />
+          <input id=flt_src class="w-full border rounded-lg px-3 py-2 mb-2" value="${FLT_SRC}" />
           <label class=text-xs>Out CSV</label>
-          <input id=flt_out class="w-full border rounded-lg px-3 py-2 mb-2" value="%%FLT_OUT%%" />
+          <input id=flt_out class="w-full border rounded-lg px-3 py-2 mb-2" value="${FLT_OUT}" />
 
           <label class=text-xs>News CSV</label>
-          <input id=flt_news class="w-full border rounded-lg px-3 py-2 mb-2" value="%%FLT_NEWS%%" />
+          <input id=flt_news class="w-full border rounded-lg px-3 py-2 mb-2" value="${FLT_NEWS}" />
 
           <div class="grid grid-cols-3 gap-2 mb-2">
             <div>
               <label class=text-xs>Min Prob</label>
-              <input id=flt_minprob type=number step="0.01" class="w-full border rounded-lg px-3 py-2" value="%%FLT_MINPROB%%" />
+              <input id=flt_minprob type=number step="0.01" class="w-full border rounded-lg px-3 py-2" value="${FLT_MINPROB}" />
             </div>
             <div>
               <label class=text-xs>Penalty</label>
-              <input id=flt_penalty type=number step="0.01" class="w-full border rounded-lg px-3 py-2" value="%%FLT_PENALTY%%" />
+              <input id=flt_penalty type=number step="0.01" class="w-full border rounded-lg px-3 py-2" value="${FLT_PENALTY}" />
             </div>
             <div>
               <label class=text-xs>Half-life (dias)</label>
-              <input id=flt_halflife type=number class="w-full border rounded-lg px-3 py-2" value="%%FLT_HALFLIFE%%" />
+              <input id=flt_halflife type=number class="w-full border rounded-lg px-3 py-2" value="${FLT_HALFLIFE}" />
             </div>
           </div>
 
@@ -481,12 +991,12 @@ def page_pipeline():
         <div class=card>
           <h3 class="font-semibold mb-2">5) Totais (Over/Under)</h3>
           <label class=text-xs>Input CSV</label>
-          <input id=tot_src class="w-full border rounded-lg px-3 py-2 mb-2" value="%%TOT_SRC%%" />
+          <input id=tot_src class="w-full border rounded-lg px-3 py-2 mb-2" value="${TOT_SRC}" />
           <label class=text-xs>Out CSV</label>
-          <input id=tot_out class="w-full border rounded-lg px-3 py-2 mb-2" value="%%TOT_OUT%%" />
+          <input id=tot_out class="w-full border rounded-lg px-3 py-2 mb-2" value="${TOT_OUT}" />
 
           <label class=text-xs>Linhas (vírgula)</label>
-          <input id=tot_lines class="w-full border rounded-lg px-3 py-2 mb-2" value="%%TOT_LINES%%" />
+          <input id=tot_lines class="w-full border rounded-lg px-3 py-2 mb-2" value="${TOT_LINES}" />
           <div class="flex gap-2 text-xs mb-2">
             <button type="button" id="preset_bo3" class="btn btn-ghost">Preset BO3 (20.5–24.5)</button>
             <button type="button" id="preset_bo5" class="btn btn-ghost">Preset BO5 (35.5–41.5)</button>
@@ -511,7 +1021,7 @@ def page_pipeline():
             </div>
             <div>
               <label class=text-xs>Min Prob</label>
-              <input id=tot_minprob type=number step="0.01" class="w-full border rounded-lg px-3 py-2" value="%%TOT_MINPROB%%" />
+              <input id=tot_minprob type=number step="0.01" class="w-full border rounded-lg px-3 py-2" value="${TOT_MINPROB}" />
             </div>
           </div>
 
@@ -549,7 +1059,7 @@ def page_pipeline():
       const $=(s)=>document.querySelector(s); const L=document.getElementById('logs');
       function log(id,msg){ const pre=document.getElementById(id); if(pre){ pre.textContent += (msg+'\\n'); pre.scrollTop=pre.scrollHeight; } L.textContent='['+new Date().toLocaleTimeString()+'] '+id+': '+msg+'\\n'+L.textContent; }
       async function postJSON(url,p){ const r=await fetch(url,{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(p)}); return r.json(); }
-      function sse(url,id){ const es=new EventSource(url); log(id,'--- streaming ---'); es.onmessage=(ev)=>{ try{ const j=JSON.parse(ev.data); if(j.event==='log') log(id,j.line); if(j.event==='end'){ log(id,'[exit '+j.code+']'); es.close(); } if(j.event==='error'){ log(id,'[error] '+j.message); es.close(); } }catch(e){ log(id,ev.data);} }; es.onerror=()=>{ log(id,'[sse error]'); es.close(); }; }
+      function sse(url,id){ const es=new EventSource(url); log(id,'--- streaming ---'); es.onmessage=(ev)=>{ try{ const j=JSON.parse(ev.data); if(j.event==='log') log(id,j.line); if(j.event==='logs') log(id,j.lines.join('\\n')); if(j.event==='end'){ log(id,'[exit '+j.code+']'); es.close(); } if(j.event==='error'){ log(id,'[error] '+j.message); es.close(); } }catch(e){ log(id,ev.data);} }; es.onerror=()=>{ log(id,'[sse error]'); es.close(); }; }
       function enc(v){ return encodeURIComponent(v); }
       function buildQS(o){ return Object.entries(o).map(kv=>kv[0]+'='+enc(kv[1])).join('&'); }
 
@@ -634,38 +1144,52 @@ def page_pipeline():
         });
       });
     </script>
-    """
+    """)
 
-    html = (html_tpl
-      .replace("%%FETCH_PROVIDER%%", g('fetch_provider','sofascore_playwright'))
-      .replace("%%FETCH_DAYS%%", g('fetch_days',2))
-      .replace("%%FETCH_OUT%%", g('fetch_out', r'data\fixtures\latest.csv'))
-      .replace("%%PREP_SRC%%", g('prep_src', r'data\fixtures\latest.csv'))
-      .replace("%%PREP_OUT%%", g('prep_out', r'data\fixtures\latest_for_tips.csv'))
-      .replace("%%TIPS_HIST%%", g('tips_hist','data/processed/matches.csv'))
-      .replace("%%TIPS_FX%%", g('tips_fx','data/fixtures/latest_for_tips.csv'))
-      .replace("%%TIPS_CFG%%", g('tips_cfg','configs/default.yaml'))
-      .replace("%%TIPS_MODEL%%", g('tips_model','models/model.joblib'))
-      .replace("%%TIPS_OUT%%", g('tips_out','outputs/tips.csv'))
-      # Parte 4 — agora com defaults reais
-      .replace("%%FLT_SRC%%", g('flt_src','outputs/tips.csv'))
-      .replace("%%FLT_OUT%%", g('flt_out','outputs/tips_filtered.csv'))
-      .replace("%%FLT_NEWS%%", g('flt_news',''))
-      .replace("%%FLT_MINPROB%%", g('flt_minprob', 0.60))
-      .replace("%%FLT_PENALTY%%", g('flt_penalty', 0.35))
-      .replace("%%FLT_HALFLIFE%%", g('flt_halflife', 7))
-      # Totals defaults
-      .replace("%%TOT_SRC%%", g('tot_src','outputs/tips.csv'))
-      .replace("%%TOT_OUT%%", g('tot_out','outputs/totals.csv'))
-      .replace("%%TOT_LINES%%", g('tot_lines','20.5,21.5,22.5,23.5'))
-      .replace("%%TOT_MINPROB%%", g('tot_minprob', 0.60))
-    )
-    return layout(html, title="Pipeline")
+_PIPELINE_PAGE: Dict[str, Any] = {"mtime": None, "page": None}
+
+@app.get("/pipeline")
+def page_pipeline():
+    mtime = _settings_mtime()
+    if _PIPELINE_PAGE["mtime"] == mtime:
+        return send_asset(_PIPELINE_PAGE["page"])
+    html = _PIPELINE_TPL.safe_substitute(settings_ctx())
+    page = _asset(layout(html, title="Pipeline"), "text/html")
+    _PIPELINE_PAGE.update(mtime=mtime, page=page)
+    return send_asset(page)
 
 # ---------- files ----------
-@app.get("/files")
-def page_files():
-    html = """
+FILES_JS = """
+// um formatador para todas as linhas (toLocaleString cria um por chamada)
+const DATE_FMT=new Intl.DateTimeFormat('pt-PT',{dateStyle:'short',timeStyle:'short'});
+const fmt=(ts)=> DATE_FMT.format(ts*1000);
+async function refreshFiles(){
+  const r=await fetch('/api/list'); const j=await r.json();
+  function list(title, arr){
+    if(!arr||!arr.length) return `<div class='text-xs text-neutral-500'>(sem ${title})</div>`;
+    return `<h4 class='font-semibold mb-2'>${title}</h4><ul class='space-y-1'>` +
+      arr.map(x=>`<li><a class='link' href='/download/${x.name}' target='_blank'>${x.name}</a> <span class='text-xs text-neutral-500'>${(x.size/1024).toFixed(1)} KB • ${fmt(x.mtime)}</span></li>`).join('') +
+      `</ul>`;
+  }
+  document.getElementById('files').innerHTML =
+    list('fixtures', j.fixtures) + list('outputs', j.outputs) + list('processed', j.processed) + list('news', j.news);
+}
+async function previewCsv(){
+  const p=document.getElementById('pv_path').value; const n=Number(document.getElementById('pv_n').value||50);
+  const r=await fetch(`/api/preview_csv?path=${encodeURIComponent(p)}&n=${n}&format=html`); const j=await r.json();
+  const preview=document.getElementById('preview');
+  if(j.error){ const e=document.createElement('div'); e.className='text-red-600'; e.textContent=j.error; preview.replaceChildren(e); return; }
+  // linhas já escapadas e juntas no servidor: um único parse, dentro de nós criados à mão
+  const wrap=document.createElement('div'); wrap.className='overflow-auto max-h-96';
+  const table=document.createElement('table'); table.className='min-w-full text-sm border';
+  table.innerHTML=j.html; wrap.appendChild(table);
+  preview.replaceChildren(wrap);
+}
+document.addEventListener('DOMContentLoaded', ()=>{ refreshFiles(); document.getElementById('btnRefresh').addEventListener('click', refreshFiles); document.getElementById('btnPreview').addEventListener('click', previewCsv); });
+"""
+add_asset("files.js", FILES_JS, "text/javascript")
+
+_FILES_PAGE = _asset(layout("""
     <div class=card>
       <div class="flex items-center justify-between mb-3">
         <h2 class="font-semibold text-lg">Ficheiros</h2>
@@ -685,86 +1209,59 @@ def page_files():
       </div>
       <div id=preview class="overflow-auto max-h-96 border rounded-xl"></div>
     </div>
-    <script>
-      const $=(s)=>document.querySelector(s);
-      async function refreshFiles(){
-        const r=await fetch('/api/list'); const j=await r.json();
-        const fmt=(ts)=> new Date(ts*1000).toLocaleString();
-        function list(title, arr){
-          if(!arr||!arr.length) return `<div class='text-xs text-neutral-500'>(sem ${title})</div>`;
-          return `<h4 class='font-semibold mb-2'>${title}</h4><ul class='space-y-1'>` +
-            arr.map(x=>`<li><a class='link' href='/download/${x.name}' target='_blank'>${x.name}</a> <span class='text-xs text-neutral-500'>${(x.size/1024).toFixed(1)} KB • ${fmt(x.mtime)}</span></li>`).join('') +
-            `</ul>`;
-        }
-        document.getElementById('files').innerHTML =
-          list('fixtures', j.fixtures) + list('outputs', j.outputs) + list('processed', j.processed) + list('news', j.news);
-      }
-      async function previewCsv(){
-        const p=document.getElementById('pv_path').value; const n=Number(document.getElementById('pv_n').value||50);
-        const r=await fetch(`/api/preview_csv?path=${encodeURIComponent(p)}&n=${n}`); const j=await r.json();
-        if(j.error){ document.getElementById('preview').innerHTML = `<div class='text-red-600'>${j.error}</div>`; return; }
-        const cols=j.columns||[]; const rows=j.rows||[];
-        const th = `<tr>${cols.map(c=>`<th class='px-3 py-2 bg-neutral-50 dark:bg-neutral-800 sticky top-0 border-b'>${c}</th>`).join('')}</tr>`;
-        const tb = rows.map(r=>`<tr>${r.map(cell=>`<td class='px-3 py-1 border-b'>${String(cell)}</td>`).join('')}</tr>`).join('');
-        document.getElementById('preview').innerHTML = `<div class='overflow-auto max-h-96'><table class='min-w-full text-sm border'>${th}${tb}</table></div>`;
-      }
-      document.addEventListener('DOMContentLoaded', ()=>{ refreshFiles(); document.getElementById('btnRefresh').addEventListener('click', refreshFiles); document.getElementById('btnPreview').addEventListener('click', previewCsv); });
-    </script>
-    """
-    return layout(html, title="Ficheiros")
+    """ + script_tag("files.js"), title="Ficheiros"), "text/html")
 
-# ---------- settings ----------
-@app.get("/settings")
-def page_settings():
-    s = read_settings()
-    def val(k, d=''): 
-        return str(s.get(k, d)) if isinstance(s, dict) else str(d)
+@app.get("/files")
+def page_files():
+    return send_asset(_FILES_PAGE)
 
-    html_tpl = r"""
+# ---------- settings ----------
+# como no pipeline: página em cache até o ui_settings.json mudar
+_SETTINGS_TPL = string.Template(r"""
     <div class=card>
       <h2 class="font-semibold text-lg mb-3">Definições</h2>
       <div class="grid md:grid-cols-2 gap-4">
         <div class=card>
           <h3 class="font-semibold mb-2">Defaults do Pipeline</h3>
           <div class="grid grid-cols-1 gap-2 text-sm">
-            <label>Provider<input id=fetch_provider class="border rounded-lg px-3 py-2" value="%%P_FETCH_PROVIDER%%"/></label>
-            <label>Dias<input id=fetch_days type=number class="border rounded-lg px-3 py-2" value="%%P_FETCH_DAYS%%"/></label>
-            <label>Fetch out<input id=fetch_out class="border rounded-lg px-3 py-2" value="%%P_FETCH_OUT%%"/></label>
-            <label>Prep src<input id=prep_src class="border rounded-lg px-3 py-2" value="%%P_PREP_SRC%%"/></label>
-            <label>Prep out<input id=prep_out class="border rounded-lg px-3 py-2" value="%%P_PREP_OUT%%"/></label>
-            <label>History<input id=tips_hist class="border rounded-lg px-3 py-2" value="%%P_TIPS_HIST%%"/></label>
-            <label>Fixtures<input id=tips_fx class="border rounded-lg px-3 py-2" value="%%P_TIPS_FX%%"/></label>
-            <label>Config<input id=tips_cfg class="border rounded-lg px-3 py-2" value="%%P_TIPS_CFG%%"/></label>
-            <label>Model<input id=tips_model class="border rounded-lg px-3 py-2" value="%%P_TIPS_MODEL%%"/></label>
-            <label>Tips out<input id=tips_out class="border rounded-lg px-3 py-2" value="%%P_TIPS_OUT%%"/></label>
+            <label>Provider<input id=fetch_provider class="border rounded-lg px-3 py-2" value="${FETCH_PROVIDER}"/></label>
+            <label>Dias<input id=fetch_days type=number class="border rounded-lg px-3 py-2" value="${FETCH_DAYS}"/></label>
+            <label>Fetch out<input id=fetch_out class="border rounded-lg px-3 py-2" value="${FETCH_OUT}"/></label>
+            <label>Prep src<input id=prep_src class="border rounded-lg px-3 py-2" value="${PREP_SRC}"/></label>
+            <label>Prep out<input id=prep_out class="border rounded-lg px-3 py-2" value="${PREP_OUT}"/></label>
+            <label>History<input id=tips_hist class="border rounded-lg px-3 py-2" value="${TIPS_HIST}"/></label>
+            <label>Fixtures<input id=tips_fx class="border rounded-lg px-3 py-2" value="${TIPS_FX}"/></label>
+            <label>Config<input id=tips_cfg class="border rounded-lg px-3 py-2" value="${TIPS_CFG}"/></label>
+            <label>Model<input id=tips_model class="border rounded-lg px-3 py-2" value="${TIPS_MODEL}"/></label>
+            <label>Tips out<input id=tips_out class="border rounded-lg px-3 py-2" value="${TIPS_OUT}"/></label>
 
             <!-- Defaults Parte 4 -->
-            <label>Filter src<input id=flt_src class="border rounded-lg px-3 py-2" value="%%P_FLT_SRC%%"/></label>
-            <label>Filter out<input id=flt_out class="border rounded-lg px-3 py-2" value="%%P_FLT_OUT%%"/></label>
-            <label>Filter news<input id=flt_news class="border rounded-lg px-3 py-2" value="%%P_FLT_NEWS%%"/></label>
-            <label>Filter min prob<input id=flt_minprob type=number step="0.01" class="border rounded-lg px-3 py-2" value="%%P_FLT_MINPROB%%"/></label>
-            <label>Filter penalty<input id=flt_penalty type=number step="0.01" class="border rounded-lg px-3 py-2" value="%%P_FLT_PENALTY%%"/></label>
-            <label>Filter half-life<input id=flt_halflife type=number class="border rounded-lg px-3 py-2" value="%%P_FLT_HALFLIFE%%"/></label>
-
-            <label>Totals src<input id=tot_src class="border rounded-lg px-3 py-2" value="%%P_TOT_SRC%%"/></label>
-            <label>Totals out<input id=tot_out class="border rounded-lg px-3 py-2" value="%%P_TOT_OUT%%"/></label>
-            <label>Totals linhas<input id=tot_lines class="border rounded-lg px-3 py-2" value="%%P_TOT_LINES%%"/></label>
+            <label>Filter src<input id=flt_src class="border rounded-lg px-3 py-2" value="${FLT_SRC}"/></label>
+            <label>Filter out<input id=flt_out class="border rounded-lg px-3 py-2" value="${FLT_OUT}"/></label>
+            <label>Filter news<input id=flt_news class="border rounded-lg px-3 py-2" value="${FLT_NEWS}"/></label>
+            <label>Filter min prob<input id=flt_minprob type=number step="0.01" class="border rounded-lg px-3 py-2" value="${FLT_MINPROB}"/></label>
+            <label>Filter penalty<input id=flt_penalty type=number step="0.01" class="border rounded-lg px-3 py-2" value="${FLT_PENALTY}"/></label>
+            <label>Filter half-life<input id=flt_halflife type=number class="border rounded-lg px-3 py-2" value="${FLT_HALFLIFE}"/></label>
+
+            <label>Totals src<input id=tot_src class="border rounded-lg px-3 py-2" value="${TOT_SRC}"/></label>
+            <label>Totals out<input id=tot_out class="border rounded-lg px-3 py-2" value="${TOT_OUT}"/></label>
+            <label>Totals linhas<input id=tot_lines class="border rounded-lg px-3 py-2" value="${TOT_LINES}"/></label>
             <label>Totals side
-              <select id=tot_side class="border rounded-lg px-3 py-2">
+              <select id=tot_side class="border rounded-lg px-3 py-2" data-value="${TOT_SIDE}">
                 <option value="over" selected>OVER</option>
                 <option value="under">UNDER</option>
                 <option value="both">OVER e UNDER</option>
               </select>
             </label>
             <label>Totals tour
-              <select id=tot_tour class="border rounded-lg px-3 py-2">
+              <select id=tot_tour class="border rounded-lg px-3 py-2" data-value="${TOT_TOUR}">
                 <option value="both">ATP + WTA</option>
                 <option value="atp" selected>ATP</option>
                 <option value="wta">WTA</option>
               </select>
             </label>
             <label>Totals competição
-              <select id=tot_comp class="border rounded-lg px-3 py-2">
+              <select id=tot_comp class="border rounded-lg px-3 py-2" data-value="${TOT_COMP}">
                 <option value="outros" selected>Outros (BO3)</option>
                 <option value="ausopen">Australian Open</option>
                 <option value="rolandgarros">Roland Garros</option>
@@ -772,77 +1269,75 @@ def page_settings():
                 <option value="usopen">US Open</option>
               </select>
             </label>
-            <label>Totals min prob<input id=tot_minprob type=number step="0.01" class="border rounded-lg px-3 py-2" value="%%P_TOT_MINPROB%%"/></label>
+            <label>Totals min prob<input id=tot_minprob type=number step="0.01" class="border rounded-lg px-3 py-2" value="${TOT_MINPROB}"/></label>
           </div>
           <div class="mt-3"><button id=btnSave class="btn btn-primary">Guardar</button></div>
         </div>
       </div>
     </div>
-    <script>
-      const $=(s)=>document.querySelector(s);
-      document.addEventListener('DOMContentLoaded', function(){
-        // Selecionar dropdowns com defaults, se existirem no JSON
-        const setSelect=(id,val)=>{ const el=document.getElementById(id); if(el && val){ el.value=val; } };
-        setSelect('tot_side', '%%P_TOT_SIDE%%');
-        setSelect('tot_tour', '%%P_TOT_TOUR%%');
-        setSelect('tot_comp', '%%P_TOT_COMP%%');
-
-        document.getElementById('btnSave').addEventListener('click', async function(){
-          const keys=[
-            'fetch_provider','fetch_days','fetch_out',
-            'prep_src','prep_out',
-            'tips_hist','tips_fx','tips_cfg','tips_model','tips_out',
-            'flt_src','flt_out','flt_news','flt_minprob','flt_penalty','flt_halflife',
-            'tot_src','tot_out','tot_lines','tot_side','tot_tour','tot_comp','tot_minprob'
-          ];
-          const obj={}; keys.forEach(function(k){ const el=document.getElementById(k); if(el) obj[k]=el.value; });
-          await fetch('/api/save_settings',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(obj)});
-          alert('Guardado.');
-        });
-      });
-    </script>
-    """
+    ${SCRIPT}
+    """)
+
+SETTINGS_JS = """
+document.addEventListener('DOMContentLoaded', function(){
+  // Selecionar dropdowns com defaults (data-value vem do JSON)
+  document.querySelectorAll('select[data-value]').forEach(function(el){ if(el.dataset.value){ el.value=el.dataset.value; } });
+
+  document.getElementById('btnSave').addEventListener('click', async function(){
+    const keys=[
+      'fetch_provider','fetch_days','fetch_out',
+      'prep_src','prep_out',
+      'tips_hist','tips_fx','tips_cfg','tips_model','tips_out',
+      'flt_src','flt_out','flt_news','flt_minprob','flt_penalty','flt_halflife',
+      'tot_src','tot_out','tot_lines','tot_side','tot_tour','tot_comp','tot_minprob'
+    ];
+    const obj={}; keys.forEach(function(k){ const el=document.getElementById(k); if(el) obj[k]=el.value; });
+    await fetch('/api/save_settings',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(obj)});
+    alert('Guardado.');
+  });
+});
+"""
+add_asset("settings.js", SETTINGS_JS, "text/javascript")
 
-    html = (html_tpl
-      .replace("%%P_FETCH_PROVIDER%%", val('fetch_provider','sofascore_playwright'))
-      .replace("%%P_FETCH_DAYS%%", val('fetch_days',2))
-      .replace("%%P_FETCH_OUT%%", val('fetch_out', r'data\fixtures\latest.csv'))
-      .replace("%%P_PREP_SRC%%", val('prep_src', r'data\fixtures\latest.csv'))
-      .replace("%%P_PREP_OUT%%", val('prep_out', r'data\fixtures\latest_for_tips.csv'))
-      .replace("%%P_TIPS_HIST%%", val('tips_hist','data/processed/matches.csv'))
-      .replace("%%P_TIPS_FX%%", val('tips_fx','data/fixtures/latest_for_tips.csv'))
-      .replace("%%P_TIPS_CFG%%", val('tips_cfg','configs/default.yaml'))
-      .replace("%%P_TIPS_MODEL%%", val('tips_model','models/model.joblib'))
-      .replace("%%P_TIPS_OUT%%", val('tips_out','outputs/tips.csv'))
-      # Parte 4 defaults
-      .replace("%%P_FLT_SRC%%", val('flt_src','outputs/tips.csv'))
-      .replace("%%P_FLT_OUT%%", val('flt_out','outputs/tips_filtered.csv'))
-      .replace("%%P_FLT_NEWS%%", val('flt_news',''))
-      .replace("%%P_FLT_MINPROB%%", val('flt_minprob', 0.60))
-      .replace("%%P_FLT_PENALTY%%", val('flt_penalty', 0.35))
-      .replace("%%P_FLT_HALFLIFE%%", val('flt_halflife', 7))
-      # Totals defaults
-      .replace("%%P_TOT_SRC%%", val('tot_src','outputs/tips.csv'))
-      .replace("%%P_TOT_OUT%%", val('tot_out','outputs/totals.csv'))
-      .replace("%%P_TOT_LINES%%", val('tot_lines','20.5,21.5,22.5,23.5'))
-      .replace("%%P_TOT_SIDE%%", val('tot_side','over'))
-      .replace("%%P_TOT_TOUR%%", val('tot_tour','both'))
-      .replace("%%P_TOT_COMP%%", val('tot_comp','outros'))
-      .replace("%%P_TOT_MINPROB%%", val('tot_minprob', 0.60))
-    )
-    return layout(html, title="Definições")
+_SETTINGS_PAGE: Dict[str, Any] = {"mtime": None, "page": None}
+
+@app.get("/settings")
+def page_settings():
+    mtime = _settings_mtime()
+    if _SETTINGS_PAGE["mtime"] == mtime:
+        return send_asset(_SETTINGS_PAGE["page"])
+    # um só substitute sobre o template já compilado (sem JS inline → estrito: falta de chave = KeyError)
+    html = _SETTINGS_TPL.substitute(settings_ctx(), SCRIPT=script_tag("settings.js"))
+    page = _asset(layout(html, title="Definições"), "text/html")
+    _SETTINGS_PAGE.update(mtime=mtime, page=page)
+    return send_asset(page)
 
 # ---------- about ----------
-@app.get("/about")
-def page_about():
-    html = """
+_ABOUT_BODY = """
     <div class=card>
       <h2 class="font-semibold text-lg mb-2">Sobre</h2>
       <p class=text-sm>Dashboard profissional para gerir a pipeline Tennis Tipster (fixtures → prep → tips → filter). Construído com Flask, Tailwind e SSE.</p>
     </div>
     """
-    return layout(html, title="Sobre")
+_ABOUT_RESPONSE = _asset(layout(_ABOUT_BODY, title="Sobre"), "text/html")  # página estática: renderizada (e comprimida) uma vez no import
+
+@app.get("/about")
+def page_about():
+    return send_asset(_ABOUT_RESPONSE)
 
 # ----------------------- run -----------------------
+# Em produção também serve: gunicorn -w 1 -k gthread --threads 16 --timeout 0 app:app
+# (-w 1: os workers dos scripts e os caches vivem no processo; gevent não, porque
+#  a leitura dos pipes dos workers bloqueia o hub sem monkey-patch de os.read)
 if __name__ == "__main__":
-    app.run(host="127.0.0.1", port=8000, debug=True)
+    # um thread por pedido: um stream SSE fica bloqueado à espera do output do worker
+    # sem impedir /api/health, /api/list ou previews em paralelo
+    try:  # opcional: servidor de produção (sem reloader nem debugger)
+        from waitress import serve
+    except ImportError:
+        serve = None
+    debug = os.environ.get("FLASK_DEBUG") == "1"
+    if serve is not None and not debug:
+        serve(app, host="127.0.0.1", port=8000, threads=16)
+    else:
+        app.run(host="127.0.0.1", port=8000, debug=debug, threaded=True)
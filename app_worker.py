@@ -0,0 +1,116 @@
+# app_worker.py — processo de um job dos scripts do pipeline (arrancado pelo app.py)
+# Arranca, importa pandas/numpy e o próprio script, e fica à espera de UM job: o argv
+# em JSON numa linha do stdin. Chama o main(argv) do script (ou corre-o como
+# `python script.py argv...` / `python -m modulo argv...` se não der) e sai com o
+# código dele. stdout/stderr são os fds 1/2 do processo (pipes para o app).
+import ast
+import importlib
+import importlib.util
+import json
+import os
+import runpy
+import sys
+from typing import Callable, Dict, Optional
+
+WARM_IMPORTS = ("pandas", "numpy")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def _source(target: str) -> Optional[str]:
+    if target.endswith(".py"):
+        return os.path.abspath(target)
+    try:
+        spec = importlib.util.find_spec(target)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec and spec.origin and spec.origin.endswith(".py") else None
+
+def _importable(path: str) -> bool:
+    """Só se importa antes do job um ficheiro com `def main` e guarda `if __name__ == "__main__"`:
+    o topo dele só define coisas. Scripts soltos correm só quando o job chega."""
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return False
+    has_main = any(isinstance(n, ast.FunctionDef) and n.name == "main" for n in tree.body)
+    has_guard = any(isinstance(n, ast.If) and "__main__" in ast.dump(n.test) for n in tree.body)
+    return has_main and has_guard
+
+def _load(target: str) -> Optional[Callable]:
+    """main() do script/módulo, importado sem correr o bloco __main__; None → runpy no job."""
+    name = "_job_" + os.path.splitext(os.path.basename(target))[0] if target.endswith(".py") else target
+    try:
+        if target.endswith(".py"):
+            spec = importlib.util.spec_from_file_location(name, target)
+            mod = importlib.util.module_from_spec(spec)
+            sys.modules[name] = mod
+            spec.loader.exec_module(mod)
+        else:
+            mod = importlib.import_module(target)
+    except BaseException:
+        sys.modules.pop(name, None)
+        return None  # o erro aparece (com traceback) quando o runpy o voltar a correr
+    main = getattr(mod, "main", None)
+    return main if callable(main) else None
+
+def _stamps(extra: str) -> Dict[str, int]:
+    """mtime do script e de todos os módulos do projeto já importados."""
+    files = {extra}
+    for mod in list(sys.modules.values()):
+        f = getattr(mod, "__file__", None)
+        if f and os.path.abspath(f).startswith(HERE + os.sep):
+            files.add(os.path.abspath(f))
+    out = {}
+    for f in files:
+        try:
+            out[f] = os.stat(f).st_mtime_ns
+        except OSError:
+            out[f] = -1
+    return out
+
+def _changed(stamps: Dict[str, int]) -> bool:
+    for f, m in stamps.items():
+        try:
+            if os.stat(f).st_mtime_ns != m:
+                return True
+        except OSError:
+            if m != -1:
+                return True
+    return False
+
+def main() -> None:
+    target = sys.argv[1]
+    os.chdir(HERE)
+    if target.endswith(".py"):
+        sys.path.insert(0, os.path.dirname(os.path.abspath(target)))  # como `python script.py`
+    for mod in WARM_IMPORTS:
+        try:
+            __import__(mod)
+        except Exception:
+            pass
+    src = _source(target)
+    entry = _load(target) if src and _importable(src) else None
+    stamps = _stamps(src or target) if entry is not None else {}
+
+    line = sys.stdin.readline()
+    if not line:
+        return  # o app fechou (ou desistiu) antes de haver job
+    argv = json.loads(line)
+    sys.argv = [target, *argv]
+    if entry is not None and _changed(stamps):
+        # código editado enquanto o worker esperava: nada de main() antigo
+        for name, mod in list(sys.modules.items()):
+            f = getattr(mod, "__file__", None)
+            if name != "__main__" and (name.startswith("_job_") or (f and os.path.abspath(f).startswith(HERE + os.sep))):
+                del sys.modules[name]
+        entry = _load(target) if _importable(src) else None
+    if entry is not None:
+        # chamada direta: o script já estava importado, só falta o main()
+        sys.exit(entry(list(argv)))
+    if target.endswith(".py"):
+        runpy.run_path(target, run_name="__main__")
+    else:
+        runpy.run_module(target, run_name="__main__", alter_sys=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,153 @@
 # scripts/fetch_fixtures.py
 import argparse
+import asyncio
+import contextlib
 import csv
 import datetime as dt
+import hashlib
+import importlib.util
 import json
 import os
 import re
+import sys
+import threading
 import time
-from typing import Any, Dict, List, Optional, Protocol
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # opcional: vários dias do SportsDataIO em paralelo num só cliente async (HTTP/2 se houver h2)
+    import httpx
+    _HTTP2 = importlib.util.find_spec("h2") is not None
+except ImportError:
+    httpx = None
+    _HTTP2 = False
+
+try:  # opcional: TLS com a impressão digital do Chrome (o SofaScore está atrás do Cloudflare)
+    from curl_cffi import requests as cffi_requests
+except ImportError:
+    cffi_requests = None
+
+try:  # parser mais rápido para os blobs grandes; aceita bytes diretamente
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj).encode("utf-8")  # noqa: E731
+
+# padrões do HTML do SofaScore, compilados uma vez e em bytes (o HTML nunca é descodificado inteiro);
+# uma só passagem apanha os três casos (o grupo que casou diz qual foi)
+_BLOB_RE = re.compile(
+    rb'id="__NEXT_DATA__"\s*type="application/json">(?P<next>.+?)</script>'
+    rb'|window\.__NUXT__\s*=\s*(?P<nuxt>\{.+?\});'
+    rb'|"events"\s*:\s*\[(?P<evs>.*?)\]\s*[,}]',
+    re.DOTALL,
+)
+_EVENTS_RE = re.compile(rb'"events"\s*:\s*\[(.*?)\]\s*[,}]', re.DOTALL)
+
+# no máximo 2 pedidos HTTP em simultâneo ao mesmo fornecedor (dias buscados em paralelo)
+_HTTP_SEM = threading.Semaphore(2)
+FETCH_WORKERS = 4
+# validadores (ETag/Last-Modified) + eventos já extraídos de cada página, para GETs condicionais
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+def http_session(headers: Dict[str, str]) -> requests.Session:
+    """Sessão com keep-alive (uma ligação TLS reutilizada entre dias) e retries para 429/5xx."""
+    s = requests.Session()
+    s.headers.update(headers)
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=RETRY_STATUS,
+                  allowed_methods=frozenset({"GET"}), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+class ChromeTLSSession:
+    """curl_cffi a imitar o ClientHello do Chrome 124 (o User-Agent deixa de ser o único sinal);
+    mesma interface .get() e mesmos retries em 429/5xx que o http_session."""
+
+    def __init__(self, headers: Dict[str, str]):
+        self._s = cffi_requests.Session(impersonate="chrome124", headers=headers)
+
+    def get(self, url: str, **kw):
+        for attempt in range(3):
+            r = self._s.get(url, **kw)
+            if r.status_code not in RETRY_STATUS or attempt == 2:
+                return r
+            time.sleep(0.5 * 2 ** attempt)
+
+def sofascore_session(headers: Dict[str, str]):
+    return ChromeTLSSession(headers) if cffi_requests is not None else http_session(headers)
 
 def iso_dates_from_today(days: int) -> List[str]:
-    today = dt.date.today()
-    return [(today + dt.timedelta(days=i)).isoformat() for i in range(days)]
+    t = dt.date.today().toordinal()
+    return [dt.date.fromordinal(t + i).isoformat() for i in range(days)]
 
 def ensure_dir_for(path: str):
     d = os.path.dirname(path)
     if d:
         os.makedirs(d, exist_ok=True)
 
-def write_csv(path: str, rows: List[Dict[str, Any]]):
+# colunas do CSV; cada linha é um tuplo nesta ordem (ver norm_row)
+FIELDS = ("date", "event_id", "tournament", "category", "surface", "home", "away", "start_ts")
+Row = Tuple[Any, ...]
+
+def write_csv(path: str, rows: Iterable[Row]):
+    """Escreve à medida que as linhas chegam (aceita um gerador); o CSV anterior só é
+    substituído no fim (temporário + os.replace), nunca fica a meio para quem o lê."""
     ensure_dir_for(path)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["date", "event_id", "tournament", "category", "surface", "home", "away", "start_ts"],
-        )
-        writer.writeheader()
-        writer.writerows(rows)
-    print(f"[ok] Gravado: {path} ({len(rows)} linhas)")
-
-def norm_row(date_iso, event_id, tournament, category, surface, home, away, start_ts):
-    return {
-        "date": date_iso,
-        "event_id": event_id or "",
-        "tournament": tournament or "",
-        "category": category or "",
-        "surface": surface or "",
-        "home": home or "",
-        "away": away or "",
-        "start_ts": start_ts,
-    }
+    tmp = path + ".tmp"
+    n = 0
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writerow = csv.writer(f).writerow
+        writerow(FIELDS)
+        for row in rows:
+            writerow(row)
+            n += 1
+    os.replace(tmp, path)
+    print(f"[ok] Gravado: {path} ({n} linhas)")
+
+def is_parquet(path: str) -> bool:
+    # o formato vem sempre da extensão: é também assim que os passos seguintes decidem como ler
+    return path.lower().endswith(".parquet")
+
+def require_pyarrow(path: str) -> None:
+    if importlib.util.find_spec("pyarrow") is None:
+        raise SystemExit(f"{path}: Parquet precisa do pyarrow (pip install 'tennistips[parquet]')")
+
+def write_parquet(path: str, rows: Iterable[Row]):
+    """Parquet (zstd) para passos intermédios: quem lê a seguir não volta a fazer parse de texto."""
+    import pandas as pd  # só este formato precisa de pandas/pyarrow
+
+    ensure_dir_for(path)
+    df = pd.DataFrame.from_records(list(rows), columns=list(FIELDS))
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+    os.replace(tmp, path)
+    print(f"[ok] Gravado: {path} ({len(df)} linhas)")
+
+def _deep(d: Any, *keys: str) -> Any:
+    """d[k1][k2]... sem criar dicts vazios pelo caminho; None se algum nível faltar/não for dict."""
+    for k in keys:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(k)
+    return d
+
+def norm_row(date_iso, event_id, tournament, category, surface, home, away, start_ts) -> Row:
+    return (date_iso, event_id or "", tournament or "", category or "", surface or "",
+            home or "", away or "", start_ts)
 
 class Provider(Protocol):
-    def fetch_day(self, date_iso: str) -> List[Dict[str, Any]]:
+    def fetch_day(self, date_iso: str) -> List[Row]:
         ...
 
 # ---------------------------
@@ -57,19 +161,44 @@ class SportsDataIOProvider:
         if not key:
             raise RuntimeError("Define a env var SPORTSDATAIO_KEY com a tua chave do SportsDataIO.")
         self.headers = {"Ocp-Apim-Subscription-Key": key}
+        self.session = http_session(self.headers)
 
-    @staticmethod
-    def _to_sdi_date(date_iso: str) -> str:
-        # SportsDataIO usa formato: 2025-AUG-29
-        d = dt.date.fromisoformat(date_iso)
-        return d.strftime("%Y-%b-%d").upper()
-
-    def fetch_day(self, date_iso: str) -> List[Dict[str, Any]]:
-        url = f"{self.BASE}/GamesByDate/{self._to_sdi_date(date_iso)}"
-        r = requests.get(url, headers=self.headers, timeout=20)
-        if r.status_code != 200:
-            raise RuntimeError(f"SportsDataIO HTTP {r.status_code}: {r.text[:200]}")
-        data = r.json() or []
+    MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+
+    @classmethod
+    def _to_sdi_date(cls, date_iso: str) -> str:
+        # SportsDataIO usa formato: 2025-AUG-29 (tabela própria: sem strftime nem locale)
+        y, m, d = date_iso.split("-")
+        return f"{y}-{cls.MONTHS[int(m) - 1]}-{d}"
+
+    def _url(self, date_iso: str) -> str:
+        return f"{self.BASE}/GamesByDate/{self._to_sdi_date(date_iso)}"
+
+    def fetch_day(self, date_iso: str) -> List[Row]:
+        with _HTTP_SEM:
+            r = self.session.get(self._url(date_iso), timeout=20)
+        return self._rows(date_iso, r.status_code, r.content)
+
+    async def fetch_days(self, dates: List[str]) -> List[Tuple[Optional[List[Row]], Optional[Exception]]]:
+        """Todos os dias de uma vez (httpx.AsyncClient + gather); mesmo formato (linhas, erro) do main()."""
+        sem = asyncio.Semaphore(2)
+
+        async def one(c, d: str):
+            try:
+                async with sem:
+                    r = await c.get(self._url(d))
+                return self._rows(d, r.status_code, r.content), None
+            except Exception as e:
+                return None, e
+
+        transport = httpx.AsyncHTTPTransport(retries=2, http2=_HTTP2)
+        async with httpx.AsyncClient(headers=self.headers, timeout=20, transport=transport) as c:
+            return list(await asyncio.gather(*(one(c, d) for d in dates)))
+
+    def _rows(self, date_iso: str, status: int, content: bytes) -> List[Row]:
+        if status != 200:
+            raise RuntimeError(f"SportsDataIO HTTP {status}: {content[:200].decode('utf-8', 'replace')}")
+        data = _loads(content) or []
         out = []
         for g in data:
             # Campos mais comuns; em trial podem vir “scrambled”
@@ -89,12 +218,17 @@ class SportsDataIOProvider:
             out.append(norm_row(date_iso, event_id, tournament, category, surface, home, away, start_ts))
         return out
 
+SOFASCORE_API = "https://api.sofascore.com/api/v1/sport/tennis/scheduled-events/{date}"
+
 # --------------------------------------------
 # Provider 2: SofaScore (HTML público, sem API)
 # --------------------------------------------
 class SofaScoreHTMLProvider:
     # Página de calendário diário, ex.: https://www.sofascore.com/tennis/2025-08-29
     BASE = "https://www.sofascore.com/tennis/{date}"
+    # mesma lista de eventos em JSON puro (~10x menos bytes que o HTML, sem regex); a página fica de recurso
+    API_BASE = SOFASCORE_API
+    API_HEADERS = {"Accept": "application/json", "Origin": "https://www.sofascore.com"}
 
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
@@ -103,101 +237,169 @@ class SofaScoreHTMLProvider:
         "Referer": "https://www.sofascore.com/",
     }
 
-    def _extract_json(self, html: str) -> Optional[Dict[str, Any]]:
+    def __init__(self):
+        self.session = sofascore_session(self.HEADERS)
+        self.sources: Dict[str, str] = {}  # dia → de onde vieram as linhas (o main() mostra no log)
+
+    def _extract_json(self, html: bytes) -> Optional[Dict[str, Any]]:
         """
         Muitos sites Next.js/NUXT injetam um JSON grande em <script> (ex.: __NEXT_DATA__, __NUXT__).
         Tentamos achar um blob com 'events' para parse.
         """
-        # 1) Procurar __NEXT_DATA__ ou __NUXT__:
-        for pat in [r'id="__NEXT_DATA__"\s*type="application/json">(.+?)</script>',
-                    r'window\.__NUXT__\s*=\s*(\{.+?\});']:
-            m = re.search(pat, html, re.DOTALL)
-            if m:
-                raw = m.group(1)
+        # caso normal (Next.js): localizar o <script> com find + slice, sem regex
+        i = html.find(b'id="__NEXT_DATA__"')
+        if i >= 0:
+            start = html.find(b">", i) + 1
+            end = html.find(b"</script>", start)
+            if start and end > start:
+                try:
+                    return _loads(html[start:end])
+                except Exception:
+                    pass
+        # primeira ocorrência de cada padrão numa só passagem; __NEXT_DATA__ tem prioridade → pára logo
+        found: Dict[str, bytes] = {}
+        for m in _BLOB_RE.finditer(html):
+            found.setdefault(m.lastgroup, m.group(m.lastgroup))
+            if m.lastgroup == "next":
+                break
+        # 1) __NEXT_DATA__ ou __NUXT__:
+        for key in ("next", "nuxt"):
+            raw = found.get(key)
+            if raw is not None:
                 try:
-                    return json.loads(raw)
+                    return _loads(raw)
                 except Exception:
                     try:
                         # às vezes termina com ;, retira
-                        return json.loads(raw.rstrip(";"))
+                        return _loads(raw.rstrip(b";"))
                     except Exception:
                         pass
         # 2) fallback “bruto”: procurar um array "events":[{...}]
-        m = re.search(r'"events"\s*:\s*\[(.*?)\]\s*[,}]', html, re.DOTALL)
-        if m:
-            txt = "[" + m.group(1) + "]"
+        evs = found.get("evs")
+        if evs is None and found:
+            # o blob que falhou o parse pode conter o "events" (a passagem acima saltou por cima dele)
+            m = _EVENTS_RE.search(html)
+            evs = m.group(1) if m else None
+        if evs is not None:
             try:
-                return {"events": json.loads(txt)}
+                return {"events": _loads(b"[" + evs + b"]")}
             except Exception:
                 pass
         return None
 
-    def _harvest_events_from_blob(self, blob: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _harvest_events_from_blob(self, blob: Dict[str, Any]) -> List[Row]:
         # Tentar caminhos comuns até obter uma lista de eventos
         candidates = []
         if "events" in blob and isinstance(blob["events"], list):
             candidates = blob["events"]
         else:
-            # Percorrer profundamente procurando uma key "events"
-            def dfs(obj):
-                out = []
-                if isinstance(obj, dict):
-                    for k, v in obj.items():
-                        if k == "events" and isinstance(v, list):
-                            out.extend(v)
-                        else:
-                            out.extend(dfs(v))
+            # Percorrer o blob com pilha explícita (sem recursão nem listas por nível), pela
+            # mesma ordem da DFS recursiva: cada lista "events" entra na pilha no lugar dela
+            # entre os irmãos (marcada com True) e só é recolhida quando sair; não se desce nela
+            stack: List[Tuple[bool, Any]] = [(False, blob)]
+            while stack:
+                found, obj = stack.pop()
+                if found:
+                    candidates.extend(obj)
+                elif isinstance(obj, dict):
+                    stack.extend(reversed([(k == "events" and isinstance(v, list), v) for k, v in obj.items()]))
                 elif isinstance(obj, list):
-                    for it in obj:
-                        out.extend(dfs(it))
-                return out
-            candidates = dfs(blob)
-        events = []
+                    stack.extend((False, v) for v in reversed(obj))
+        # dedupe por event_id (fica a primeira ocorrência)
+        uniq: Dict[Any, tuple] = {}
         for ev in candidates:
             if not isinstance(ev, dict):
                 continue
             # heurística mínima: exige id + equipas/jogadores
-            event_id = ev.get("id") or ev.get("event", {}).get("id")
-            if not event_id:
+            event_id = ev.get("id") or _deep(ev, "event", "id")
+            if not event_id or event_id in uniq:
                 continue
-            tour = (ev.get("tournament") or {}).get("name") or ""
-            cat = (ev.get("tournament") or {}).get("category", {}).get("name") or ""
-            home = (ev.get("homeTeam") or ev.get("homePlayer") or {}).get("name") or ""
-            away = (ev.get("awayTeam") or ev.get("awayPlayer") or {}).get("name") or ""
-            start_ts = ev.get("startTimestamp") or (ev.get("event") or {}).get("startTimestamp")
+            tour = _deep(ev, "tournament", "name") or ""
+            cat = _deep(ev, "tournament", "category", "name") or ""
+            home = _deep(ev.get("homeTeam") or ev.get("homePlayer"), "name") or ""
+            away = _deep(ev.get("awayTeam") or ev.get("awayPlayer"), "name") or ""
+            start_ts = ev.get("startTimestamp") or _deep(ev, "event", "startTimestamp")
             surface = ""
-            events.append((event_id, tour, cat, surface, home, away, start_ts))
-        # dedupe por event_id
-        seen = set()
-        uniq = []
-        for row in events:
-            if row[0] in seen:
-                continue
-            seen.add(row[0])
-            uniq.append(row)
-        return uniq
+            uniq[event_id] = (event_id, tour, cat, surface, home, away, start_ts)
+        return list(uniq.values())
 
-    def fetch_day(self, date_iso: str) -> List[Dict[str, Any]]:
-        url = self.BASE.format(date=date_iso)
-        r = requests.get(url, headers=self.HEADERS, timeout=25)
-        if r.status_code != 200:
-            raise RuntimeError(f"SofaScore HTML HTTP {r.status_code}")
-        blob = self._extract_json(r.text)
+    @staticmethod
+    def _store(path: Path, entry: Dict[str, Any]) -> None:
+        # um ficheiro por URL (dias em threads diferentes não partilham nada) e os.replace atómico
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(_dumps(entry))
+            os.replace(tmp, path)
+        except OSError:
+            pass  # cache é só uma otimização
+
+    def _rows_from_api(self, content: bytes) -> List[Row]:
+        data = _loads(content)
+        if not isinstance(data, dict):
+            raise RuntimeError("Resposta inesperada da API do SofaScore.")
+        return self._harvest_events_from_blob(data)
+
+    def _rows_from_html(self, content: bytes) -> List[Row]:
+        blob = self._extract_json(content)  # bytes crus: sem deteção de charset nem decode do HTML
         if not blob:
             raise RuntimeError("Não consegui extrair JSON da página pública do SofaScore.")
-        rows = self._harvest_events_from_blob(blob)
+        return self._harvest_events_from_blob(blob)
+
+    def fetch_day(self, date_iso: str) -> List[Row]:
+        try:
+            rows, src = self._cached_rows(self.API_BASE.format(date=date_iso), self.API_HEADERS, self._rows_from_api), "api"
+        except Exception as e:
+            rows, src = [], f"api falhou ({e})"
+        if not rows:
+            # API bloqueada (Cloudflare), ilegível ou 200 sem eventos (soft-block, esquema novo): página HTML pública
+            rows = self._cached_rows(self.BASE.format(date=date_iso), {}, self._rows_from_html)
+            src = ("api vazia" if src == "api" else src) + " → html"
+        self.sources[date_iso] = src
         return [
             norm_row(date_iso, ev_id, tour, cat, surf, home, away, start_ts)
             for (ev_id, tour, cat, surf, home, away, start_ts) in rows
         ]
 
+    def _cached_rows(self, url: str, headers: Dict[str, str], parse) -> List[Row]:
+        """GET condicional (ETag/Last-Modified): 304 → eventos guardados da última vez; 200 → parse(bytes)."""
+        cache_path = CACHE_DIR / f"sofascore_{hashlib.sha1(url.encode()).hexdigest()[:16]}.json"
+        try:
+            cached = _loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            cached = None
+        headers = dict(headers)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        with _HTTP_SEM:
+            r = self.session.get(url, headers=headers, timeout=25)
+        if r.status_code == 304 and cached:
+            return cached["rows"]  # igual à última vez: nem download nem parse
+        if r.status_code != 200:
+            raise RuntimeError(f"SofaScore HTTP {r.status_code}")
+        rows = parse(r.content)
+        etag, last_mod = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        if etag or last_mod:
+            self._store(cache_path, {"etag": etag, "last_modified": last_mod, "rows": rows})
+        return rows
+
 # ------------------------------------------------------
 # Provider 3: SofaScore via Playwright (headless browser)
 # ------------------------------------------------------
 # --- PATCH: substitui a tua classe SofaScorePlaywrightProvider por esta ---
 class SofaScorePlaywrightProvider:
-    API_BASE = "https://api.sofascore.com/api/v1/sport/tennis/scheduled-events/{date}"
+    API_BASE = SOFASCORE_API
     PAGE = "https://www.sofascore.com/tennis/{date}"
+    API_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        "Accept": "application/json",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.sofascore.com/",
+        "Origin": "https://www.sofascore.com",
+    }
 
     def __init__(self):
         try:
@@ -207,51 +409,111 @@ class SofaScorePlaywrightProvider:
                 "Playwright não está instalado. Faz: pip install playwright && playwright install"
             ) from e
         self._sync_playwright = __import__("playwright.sync_api", fromlist=["sync_playwright"]).sync_playwright
+        self.session = sofascore_session(self.API_HEADERS)
+        # só um CHROME_EXE explícito; senão o Playwright usa o build que corresponde à sua versão
+        self._exe = os.environ.get("CHROME_EXE") or None
+        # browser/contexto lançados no 1.º dia que precise deles; dentro de "with provider:" ficam
+        # abertos para os dias seguintes (cookies e ligações incluídos), fora disso fecham-se logo
+        self._pw = self._browser = self._ctx = None
+        self._keep = False
+        self.sources: Dict[str, str] = {}  # dia → API direta ou qual dos caminhos do browser
+
+    def __enter__(self):
+        self._keep = True
+        return self
+
+    def __exit__(self, *exc):
+        self._keep = False
+        self.close()
+
+    def _context(self):
+        if self._ctx is None:
+            self._pw = self._sync_playwright().start()
+            self._browser = self._pw.chromium.launch(
+                headless=True,
+                executable_path=self._exe,
+                # /dev/shm pequeno em containers; imagens desligadas no próprio Blink
+                args=["--disable-dev-shm-usage", "--disable-gpu", "--blink-settings=imagesEnabled=false"],
+            )
+            self._ctx = self._browser.new_context(
+                locale="en-US",
+                timezone_id="Europe/Lisbon",
+                user_agent=self.API_HEADERS["User-Agent"],
+            )
+            # só interessa o JSON dos eventos: nem imagens, nem fontes, nem CSS
+            self._ctx.route("**/*", self._route)
+        return self._ctx
+
+    BLOCKED = frozenset({"image", "font", "media", "stylesheet"})
 
-    def fetch_day(self, date_iso: str) -> List[Dict[str, Any]]:
-        rows: List[Dict[str, Any]] = []
+    @classmethod
+    def _route(cls, route):
+        if route.request.resource_type in cls.BLOCKED:
+            route.abort()
+        else:
+            route.continue_()
+
+    @staticmethod
+    def _is_schedule(resp) -> bool:
+        url = resp.url.lower()
+        return "api.sofascore.com" in url and "scheduled-events" in url and "/tennis/" in url
+
+    def close(self):
+        if self._browser is not None:
+            self._browser.close()
+        if self._pw is not None:
+            self._pw.stop()
+        self._pw = self._browser = self._ctx = None
+
+    def _try_api_direct(self, date_iso: str) -> Optional[Dict[str, Any]]:
+        """API JSON pedida diretamente (sem browser). None se bloqueada (Cloudflare 403, página de desafio...)."""
+        try:
+            r = self.session.get(self.API_BASE.format(date=date_iso), timeout=15)
+            if r.status_code != 200:
+                return None
+            data = _loads(r.content)
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
 
+    @staticmethod
+    def _events(data) -> List[Any]:
+        if not isinstance(data, dict):
+            return []
+        return _deep(data, "events") or _deep(data, "sportItem", "events") or []
+
+    def fetch_day(self, date_iso: str) -> List[Row]:
         def normalize_events(data):
-            events = (data or {}).get("events") or (data or {}).get("sportItem", {}).get("events") or []
+            events = self._events(data)
             out = []
             for ev in events:
                 if not isinstance(ev, dict):
                     continue
-                tournament = (ev.get("tournament") or {}).get("name") or ""
-                category = (ev.get("tournament") or {}).get("category", {}).get("name") or ""
-                home = (ev.get("homeTeam") or ev.get("homePlayer") or {}).get("name") or ""
-                away = (ev.get("awayTeam") or ev.get("awayPlayer") or {}).get("name") or ""
-                start_ts = ev.get("startTimestamp")
-                event_id = ev.get("id")
-                out.append({
-                    "date": date_iso,
-                    "event_id": event_id or "",
-                    "tournament": tournament,
-                    "category": category,
-                    "surface": "",
-                    "home": home,
-                    "away": away,
-                    "start_ts": start_ts,
-                })
+                tournament = _deep(ev, "tournament", "name") or ""
+                category = _deep(ev, "tournament", "category", "name") or ""
+                home = _deep(ev.get("homeTeam") or ev.get("homePlayer"), "name") or ""
+                away = _deep(ev.get("awayTeam") or ev.get("awayPlayer"), "name") or ""
+                out.append(norm_row(date_iso, ev.get("id"), tournament, category, "", home, away,
+                                    ev.get("startTimestamp")))
             return out
 
-        with self._sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                locale="en-US",
-                timezone_id="Europe/Lisbon",
-                user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                            "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"),
-            )
-            page = context.new_page()
+        # 0) API direta: se responder com eventos, nem se lança o Chromium
+        #    (200 sem eventos = soft-block do Cloudflare ou esquema novo → browser)
+        data = self._try_api_direct(date_iso)
+        if self._events(data):
+            self.sources[date_iso] = "api direta"
+            return normalize_events(data)
+        src = "api direta vazia" if data is not None else "api direta bloqueada"
 
+        context = self._context()
+        page = context.new_page()
+        try:
             captured_json = []
 
             def on_response(resp):
-                url = resp.url.lower()
-                if ("api.sofascore.com" in url and "scheduled-events" in url and "/tennis/" in url):
+                if self._is_schedule(resp):
                     try:
-                        data = resp.json()
+                        data = _loads(resp.body())
                         if isinstance(data, dict):
                             captured_json.append(data)
                     except Exception:
@@ -259,34 +521,43 @@ class SofaScorePlaywrightProvider:
 
             page.on("response", on_response)
 
-            # 1) Abre a página e espera "quietude" de rede
-            page.goto(self.PAGE.format(date=date_iso), wait_until="networkidle", timeout=60000)
+            def with_events():
+                for blob in captured_json:
+                    if self._events(blob):
+                        return blob
+                return None
+
+            # 1) Abre a página (só o DOM) e espera apenas pelo XHR dos eventos, não pela rede toda
+            try:
+                with page.expect_response(self._is_schedule, timeout=15000):
+                    page.goto(self.PAGE.format(date=date_iso), wait_until="domcontentloaded", timeout=60000)
+            except Exception:
+                pass
 
-            # 2) Pequeno scroll para disparar lazy loads + novo idle
-            page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(1200)
-            page.wait_for_load_state("networkidle")
+            # 2) Sem eventos ainda: scroll para disparar lazy loads + "quietude" de rede
+            if with_events() is None:
+                page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+                page.wait_for_timeout(1200)
+                page.wait_for_load_state("networkidle")
 
-            data = None
             # 3) Usar qualquer blob XHR que tenha eventos
-            for blob in captured_json:
-                evs = blob.get("events") or blob.get("sportItem", {}).get("events")
-                if evs:
-                    data = blob
-                    break
+            data = with_events()
+            via = "xhr da página"
 
             # 4) Fallback: HTTP client do Playwright (herda parte do contexto)
-            if not data:
+            if not self._events(data):
+                via = "context.request"
                 try:
                     api_url = self.API_BASE.format(date=date_iso)
                     r = context.request.get(api_url, timeout=20000)
                     if r.ok:
-                        data = r.json()
+                        data = _loads(r.body())
                 except Exception:
                     data = None
 
-            # 5) Fallback final (NOVO): fetch no contexto da página (usa Referer/UA do browser)
-            if not data:
+            # 5) Fallback final: fetch no contexto da página (usa Referer/UA do browser)
+            if not self._events(data):
+                via = "fetch na página"
                 try:
                     api_url = self.API_BASE.format(date=date_iso)
                     js = f"""
@@ -302,21 +573,26 @@ class SofaScorePlaywrightProvider:
                     data = page.evaluate(js)
                 except Exception:
                     data = None
+        finally:
+            page.close()
+            if not self._keep:
+                self.close()
 
-            browser.close()
-
+        self.sources[date_iso] = f"{src} → browser, {via}" + ("" if self._events(data) else " (sem eventos)")
         return normalize_events(data)
 
 # ---------------------------
 # CLI
 # ---------------------------
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--out", required=True)
+    ap.add_argument("--out", required=True, help="*.parquet (zstd) para passos intermédios; senão CSV")
     ap.add_argument("--days", type=int, default=1, help="Quantos dias a partir de hoje (inclui hoje). Use 2 para amanhã.")
     ap.add_argument("--provider", choices=["sportsdataio", "sofascore_html", "sofascore_playwright"],
                     default="sofascore_html")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
+    if is_parquet(args.out):
+        require_pyarrow(args.out)  # falhar já, não depois de ir buscar tudo
 
     if args.provider == "sportsdataio":
         provider: Provider = SportsDataIOProvider()
@@ -326,19 +602,46 @@ def main():
         provider = SofaScoreHTMLProvider()
 
     dates = iso_dates_from_today(args.days)
-    rows: List[Dict[str, Any]] = []
-    for d in dates:
-        print(f"[info] A buscar fixtures de {d} via {args.provider}...")
-    try:
-        day_rows = provider.fetch_day(d)
-        print(f"[info] {len(day_rows)} eventos em {d}")
-        rows.extend(day_rows)
-    except Exception as e:
-        print(f"[warn] Falhou {d}: {e}")
-    time.sleep(0.7)
+    print(f"[info] A buscar fixtures de {', '.join(dates)} via {args.provider}...")
+
+    def fetch(d: str):
+        try:
+            return provider.fetch_day(d), None
+        except Exception as e:
+            return None, e
+
+    def results() -> Iterator[Tuple[str, Tuple[Optional[List[Row]], Optional[Exception]]]]:
+        if len(dates) > 1 and httpx is not None and hasattr(provider, "fetch_days"):
+            # SportsDataIO com httpx: um cliente async, todos os dias em voo ao mesmo tempo
+            yield from zip(dates, asyncio.run(provider.fetch_days(dates)))
+        elif args.provider == "sofascore_playwright" or len(dates) < 2:
+            # browser headless: um dia de cada vez, com pausa entre dias; o mesmo browser serve todos
+            with contextlib.ExitStack() as stack:
+                if isinstance(provider, SofaScorePlaywrightProvider):
+                    stack.enter_context(provider)
+                for i, d in enumerate(dates):
+                    if i:
+                        time.sleep(0.7)
+                    yield d, fetch(d)
+        else:
+            # HTTP: os dias sobrepõem a latência (limitados por _HTTP_SEM); map entrega pela ordem das datas
+            with ThreadPoolExecutor(max_workers=min(len(dates), FETCH_WORKERS)) as ex:
+                yield from zip(dates, ex.map(fetch, dates))
+
+    sources: Dict[str, str] = getattr(provider, "sources", {})
 
+    def rows() -> Iterator[Row]:
+        # cada dia vai para o CSV assim que chega; logs só a partir desta thread (stdout pode ser um pipe sem lock)
+        for d, (day_rows, err) in results():
+            if err is not None:
+                print(f"[warn] Falhou {d}: {err}")
+            else:
+                src = sources.get(d)
+                print(f"[info] {len(day_rows)} eventos em {d}" + (f" (via {src})" if src else ""))
+                yield from day_rows
 
-    write_csv(args.out, rows)
+    (write_parquet if is_parquet(args.out) else write_csv)(args.out, rows())
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
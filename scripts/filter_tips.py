@@ -3,6 +3,7 @@
 Filtro de tips com fator de notícias (lesões, withdrawals, etc.)
 Uso:
   python scripts/filter_tips.py INPUT.csv OUTPUT.csv --min-prob 0.60 --news data/news/news_flags.csv --penalty 0.35 --half-life 7
+  (INPUT/OUTPUT/notícias em *.parquet são lidos/escritos como Parquet; precisa do pyarrow)
 Colunas esperadas (flexível):
   - Probabilidades de base:
       * pred_prob  (prob. P1)  OU
@@ -21,6 +22,11 @@ from typing import List, Optional, Dict, Tuple
 import pandas as pd
 import numpy as np
 
+try:  # opcional: só para ficheiros *.parquet
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 # ---------- helpers ----------
 def find_col(df: pd.DataFrame, options: List[str]) -> Optional[str]:
     for c in options:
@@ -31,6 +37,15 @@ def find_col(df: pd.DataFrame, options: List[str]) -> Optional[str]:
 def today_utc() -> datetime:
     return datetime.now(timezone.utc)
 
+# status → severidade (a primeira chave contida no status ganha, por esta ordem)
+STATUS_SEVERITY = {
+    "withdrawal": 1.00, "withdrew": 1.00, "retired": 0.95, "retirement": 0.95,
+    "injury": 0.85, "lesion": 0.85, "lesão": 0.85,
+    "illness": 0.75, "flu": 0.70, "covid": 0.85,
+    "fatigue": 0.55, "jetlag": 0.45, "travel": 0.40,
+}
+DEFAULT_SEVERITY = 0.50  # neutro-moderado
+
 def parse_severity(row: Dict[str, str]) -> float:
     # prioridade: severity numérica
     sev = row.get("severity", "")
@@ -42,24 +57,51 @@ def parse_severity(row: Dict[str, str]) -> float:
         pass
     # mapear por status
     status = (row.get("status", "") or "").strip().lower()
-    mapping = {
-        "withdrawal": 1.00, "withdrew": 1.00, "retired": 0.95, "retirement": 0.95,
-        "injury": 0.85, "lesion": 0.85, "lesão": 0.85,
-        "illness": 0.75, "flu": 0.70, "covid": 0.85,
-        "fatigue": 0.55, "jetlag": 0.45, "travel": 0.40,
-    }
-    for k, v in mapping.items():
+    for k, v in STATUS_SEVERITY.items():
         if k in status:
             return v
-    return 0.50  # default neutro-moderado
+    return DEFAULT_SEVERITY
+
+def severity_series(news_df: pd.DataFrame) -> np.ndarray:
+    """parse_severity para a tabela inteira de uma vez: severity numérica em [0,1] se houver,
+    senão o status mapeado (np.select respeita a ordem do STATUS_SEVERITY)."""
+    num = pd.to_numeric(news_df["severity"].astype(str).str.strip(), errors="coerce")
+    status = news_df["status"].astype(str).str.strip().str.lower()
+    by_status = np.select([status.str.contains(k, regex=False).to_numpy() for k in STATUS_SEVERITY],
+                          list(STATUS_SEVERITY.values()), default=DEFAULT_SEVERITY)
+    return np.where(num.between(0, 1).to_numpy(), num.to_numpy(dtype=float), by_status)
 
 def half_life_decay(days: float, half_life_days: float) -> float:
     if half_life_days <= 0:
         return 1.0
-    return 0.5 ** (days / half_life_days)
+    return 0.5 ** (days / half_life_days)  # também aceita arrays de dias
+
+def is_parquet(path: str) -> bool:
+    return path.lower().endswith(".parquet")
+
+def require_pyarrow(path: str) -> None:
+    if pa is None:
+        raise SystemExit(f"{path}: Parquet precisa do pyarrow (pip install 'tennistips[parquet]')")
+
+def read_table(path: str) -> pd.DataFrame:
+    """.parquet → binário (sem parse de texto); qualquer outra extensão → CSV"""
+    if is_parquet(path):
+        require_pyarrow(path)
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+NEWS_COLS = ("player", "status", "severity", "date", "detail", "source")
+
+def _news_col(c) -> bool:
+    return str(c).lower().startswith(NEWS_COLS)
 
 def load_news(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    # só as colunas que interessam, tudo como texto (sem inferência de tipos: o parse é feito abaixo)
+    if is_parquet(path):
+        require_pyarrow(path)
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, usecols=_news_col, dtype=str)
     # normalizar colunas
     cols = {c.lower(): c for c in df.columns}
     rename = {}
@@ -81,28 +123,35 @@ def load_news(path: str) -> pd.DataFrame:
     df["date_dt"] = pd.to_datetime(df["date"], errors="coerce", utc=True)
     return df
 
-def player_risk(player_name: str, match_dt: Optional[datetime], news_df: pd.DataFrame, half_life_days: float) -> Tuple[float, str]:
-    if news_df is None or news_df.empty or not player_name:
+RiskTable = Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+def epoch_seconds(s: pd.Series) -> np.ndarray:
+    """datetimes UTC → segundos desde 1970 (NaN onde não há data)"""
+    return (s - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy(dtype=float)
+
+def build_risk_table(news_df: pd.DataFrame) -> RiskTable:
+    """player_norm → (severidade, data em segundos, status) de cada notícia, calculados uma só vez."""
+    sev = severity_series(news_df)
+    ts = epoch_seconds(news_df["date_dt"])
+    tags = news_df["status"].map(lambda v: str(v or "")).to_numpy(dtype=object)
+    return {name: (sev[idx], ts[idx], tags[idx])
+            for name, idx in news_df.groupby("player_norm", sort=False).indices.items()}
+
+def player_risk(player_name: str, base_ts: float, table: RiskTable, half_life_days: float) -> Tuple[float, str]:
+    """maior risco (severidade × decaimento pela idade da notícia) do jogador à data base_ts, e o status dessa notícia"""
+    hit = table.get(str(player_name).strip().lower()) if player_name else None
+    if hit is None:
         return 0.0, ""
-    pnorm = str(player_name).strip().lower()
-    rel = news_df[news_df["player_norm"] == pnorm]
-    if rel.empty:
+    sev, ts, tags = hit
+    days = np.where(np.isnan(ts), 0.0, np.maximum(0.0, (base_ts - ts) / 86400.0))
+    risks = sev * half_life_decay(days, half_life_days)
+    i = int(np.argmax(risks))  # primeira notícia com o risco máximo
+    if not risks[i] > 0:
         return 0.0, ""
-    base = match_dt or today_utc()
-    best_risk = 0.0
-    best_tag = ""
-    for _, r in rel.iterrows():
-        dt = r.get("date_dt")
-        days = 0.0 if (pd.isna(dt) or dt is None) else max(0.0, (base - dt.to_pydatetime()).total_seconds() / 86400.0)
-        sev = parse_severity({"status": str(r.get("status","")), "severity": str(r.get("severity",""))})
-        risk = float(sev) * half_life_decay(days, half_life_days)
-        if risk > best_risk:
-            best_risk = risk
-            best_tag = str(r.get("status","") or "")
-    return float(best_risk), best_tag
+    return float(risks[i]), tags[i]
 
 # ---------- main ----------
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("src")
     ap.add_argument("out")
@@ -110,10 +159,12 @@ def main():
     ap.add_argument("--news", type=str, default=None, help="CSV de notícias (player,status,severity,date,detail,source)")
     ap.add_argument("--penalty", type=float, default=0.35, help="penalização máxima aplicada (0–1), default 0.35")
     ap.add_argument("--half-life", type=float, default=7.0, help="meia-vida em dias (default 7)")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
+    if is_parquet(args.out):
+        require_pyarrow(args.out)
 
-    # carregar tips
-    df = pd.read_csv(args.src)
+    # carregar tips (.parquet ou CSV)
+    df = read_table(args.src)
     df = df.reset_index(drop=True)
     n0 = len(df)
 
@@ -156,14 +207,13 @@ def main():
     # riscos por jogador
     r1_list, r1_tag, r2_list, r2_tag = [], [], [], []
     if news_df is not None and not news_df.empty and p1n and p2n:
-        for i in range(len(df)):
-            dt = None
-            if dcol and not pd.isna(match_dates.iloc[i]):
-                dt = match_dates.iloc[i].to_pydatetime()
-            nm1 = str(df.iloc[i][p1n]) if p1n else ""
-            nm2 = str(df.iloc[i][p2n]) if p2n else ""
-            r1, t1 = player_risk(nm1, dt, news_df, args.half_life)
-            r2, t2 = player_risk(nm2, dt, news_df, args.half_life)
+        # notícias agrupadas por jogador uma vez; por jogo só se olha para as do próprio jogador
+        table = build_risk_table(news_df)
+        base = epoch_seconds(match_dates) if dcol else np.full(len(df), np.nan)
+        base = np.where(np.isnan(base), today_utc().timestamp(), base)
+        for nm1, nm2, bt in zip(df[p1n].astype(str), df[p2n].astype(str), base):
+            r1, t1 = player_risk(nm1, bt, table, args.half_life)
+            r2, t2 = player_risk(nm2, bt, table, args.half_life)
             r1_list.append(r1); r1_tag.append(t1)
             r2_list.append(r2); r2_tag.append(t2)
     else:
@@ -187,23 +237,29 @@ def main():
     df["p1_prob_adj"] = p1_adj
     df["p2_prob_adj"] = p2_adj
 
-    # pick e prob ajustados
-    df["pick"] = np.where(df["p1_prob_adj"] >= df["p2_prob_adj"], "P1", "P2")
-    df["pick_prob"] = np.where(df["pick"].eq("P1"), df["p1_prob_adj"], df["p2_prob_adj"])
+    # pick e prob ajustados (uma máscara em numpy serve para as três colunas)
+    is_p1 = p1_adj >= p2_adj
+    df["pick"] = np.where(is_p1, "P1", "P2")
+    df["pick_prob"] = np.where(is_p1, p1_adj, p2_adj)
 
     # nome do pick (se possível)
     if p1n and p2n:
-        df["pick_name"] = np.where(df["pick"].eq("P1"), df[p1n], df[p2n])
+        df["pick_name"] = np.where(is_p1, df[p1n].to_numpy(), df[p2n].to_numpy())
 
     # --------- FILTRO com min_prob (corrigido) ---------
     min_prob = float(args.min_prob)
-    mask = df["pick_prob"] >= min_prob
-    df_out = df[mask].copy()
-    df_out = df_out.sort_values(["pick_prob"], ascending=[False])
+    # posições que passam o filtro, já ordenadas por pick_prob desc → um só gather (sem cópia + sort)
+    pp = df["pick_prob"].to_numpy(dtype=float)
+    idx = np.flatnonzero(pp >= min_prob)
+    df_out = df.iloc[idx[np.argsort(-pp[idx], kind="stable")]]
 
     # guardar
-    df_out.to_csv(args.out, index=False)
+    if is_parquet(args.out):
+        df_out.to_parquet(args.out, engine="pyarrow", compression="zstd", index=False)
+    else:
+        df_out.to_csv(args.out, index=False)
     print(f"[filter] {n0} -> {len(df_out)} linhas | min_prob={min_prob:.2f} | news={'ON' if (news_df is not None and not news_df.empty) else 'OFF'} -> {args.out}")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -11,8 +11,9 @@ Exemplos:
   python scripts/generate_overunders.py outputs/tips.csv outputs/totals.csv \
     --lines 20.5,21.5,22.5,23.5 --tour atp --categories 1000,500,250 --min-prob 0.60
 """
-import argparse, re, math
+import argparse, re, math, sys
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Optional, Dict
 import pandas as pd
 import numpy as np
@@ -56,8 +57,14 @@ def parse_severity(row: Dict[str, str]) -> float:
             return v
     return 0.50
 
+NEWS_COLS = ("player", "status", "severity", "date", "detail", "source")
+
+def _news_col(c) -> bool:
+    return str(c).lower().startswith(NEWS_COLS)
+
 def load_news(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    # só as colunas que interessam, tudo como texto (sem inferência de tipos: o parse é feito abaixo)
+    df = pd.read_csv(path, usecols=_news_col, dtype=str)
     cols = {c.lower(): c for c in df.columns}
     rename = {}
     for want in ["player","status","severity","date","detail","source"]:
@@ -93,6 +100,8 @@ def player_risk(player_name: str, match_dt: Optional[datetime], news_df: pd.Data
         best = max(best, sev * half_life_decay(days, half_life_days))
     return float(best)
 
+# nomes de torneio/piso repetem-se muito entre linhas -> cache por valor
+@lru_cache(maxsize=4096)
 def parse_surface(val: str) -> str:
     s = (str(val) or "").lower()
     if "clay" in s or "terra" in s: return "clay"
@@ -100,6 +109,7 @@ def parse_surface(val: str) -> str:
     if "carpet" in s: return "carpet"
     return "hard"
 
+@lru_cache(maxsize=4096)
 def detect_tour_from_text(t_name: str, tour_val: str) -> str:
     s = ((tour_val or "") + " " + (t_name or "")).lower()
     if "wta" in s or "women" in s or "ladies" in s:
@@ -108,6 +118,7 @@ def detect_tour_from_text(t_name: str, tour_val: str) -> str:
         return "atp"
     return "unknown"
 
+@lru_cache(maxsize=4096)
 def detect_category(t_name: str, level_val: str) -> str:
     s = ((level_val or "") + " " + (t_name or "")).lower()
     if any(x in s for x in ["grand slam","australian open","roland garros","french open","wimbledon","us open"]):
@@ -151,7 +162,7 @@ def adjust_tour_if_gs(tour_tag: str, cat: str, best_of: int) -> str:
 
 # -------------- main --------------
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("src")
     ap.add_argument("out")
@@ -177,7 +188,7 @@ def main():
     ap.add_argument("--categories", type=str, default="", help="lista: gs,1000,500,250,challenger,itf")
     ap.add_argument("--best-of", type=int, default=None, help="3 ou 5")
     ap.add_argument("--name-like", type=str, default="", help="regex para nome do torneio")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     # carregar
     df = pd.read_csv(args.src).reset_index(drop=True)
@@ -226,7 +237,7 @@ def main():
     if args.name_like and tname_col:
         try:
             rx = re.compile(args.name_like, re.IGNORECASE)
-            mask &= tname.apply(lambda s: bool(rx.search(s))).to_numpy()
+            mask &= tname.str.contains(rx, na=False).to_numpy(dtype=bool)
         except re.error:
             print(f"[totals] aviso: regex inválido em --name-like: {args.name_like}")
 
@@ -236,7 +247,7 @@ def main():
         pd.DataFrame().to_csv(args.out, index=False)
         cats_repr = sorted(list(cats_req)) if cats_req else "all"
         print(f"[totals] 0 jogos após filtros (tour={args.tour}, cats={cats_repr}, bo={args.best_of or 'all'}) -> {args.out}")
-        return
+        return 0
 
     # Recalcular meta ALINHADA ao DF filtrado (evita 'tournament' repetido)
     n0 = len(df)
@@ -281,9 +292,11 @@ def main():
     if sfc_col is None:
         sfc_col = find_col(df, ["surface","court","surface_name"])
 
+    sfc_vals = df[sfc_col].to_numpy() if sfc_col else None
+
     def row_surface(i: int) -> str:
-        if sfc_col:
-            return parse_surface(df.iloc[i][sfc_col])
+        if sfc_vals is not None:
+            return parse_surface(sfc_vals[i])
         return "hard"
 
     # notícias
@@ -371,6 +384,7 @@ def main():
     out_df.to_csv(args.out, index=False)
     cats_repr = args.categories or "all"
     print(f"[totals] {n0} jogos após filtros (tour={args.tour}, cats={cats_repr}, bo={args.best_of or 'all'}) • linhas={lines_all} • side={args.side} • min_prob={args.min_prob:.2f} -> {len(out_df)} picks -> {args.out}")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
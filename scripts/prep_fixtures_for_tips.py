@@ -1,28 +1,42 @@
 # scripts/prep_fixtures_for_tips.py  (substitui o conteúdo anterior)
 import pandas as pd
+import importlib.util
 import sys, os
+from typing import List, Optional
 
-src = sys.argv[1] if len(sys.argv) > 1 else "data/fixtures/latest.csv"
-dst = sys.argv[2] if len(sys.argv) > 2 else "data/fixtures/latest_for_tips.csv"
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    src = argv[0] if len(argv) > 0 else "data/fixtures/latest.csv"
+    dst = argv[1] if len(argv) > 1 else "data/fixtures/latest_for_tips.csv"
 
-df = pd.read_csv(src)
+    # fixtures em Parquet (fetch --out *.parquet) ou CSV
+    if src.lower().endswith(".parquet"):
+        if importlib.util.find_spec("pyarrow") is None:
+            raise SystemExit(f"{src}: Parquet precisa do pyarrow (pip install 'tennistips[parquet]')")
+        df = pd.read_parquet(src)
+    else:
+        df = pd.read_csv(src)
 
-# Renomear para o que o tips.py espera
-df = df.rename(columns={"home": "player1", "away": "player2"})
+    # Renomear para o que o tips.py espera
+    df = df.rename(columns={"home": "player1", "away": "player2"})
 
-# Odds: se não existirem ou vierem vazias, mete padrão 1.90
-for c in ["odds_p1", "odds_p2"]:
-    if c not in df.columns:
-        df[c] = 1.90
-df["odds_p1"] = df["odds_p1"].fillna(1.90)
-df["odds_p2"] = df["odds_p2"].fillna(1.90)
+    # Odds: se não existirem ou vierem vazias, mete padrão 1.90
+    for c in ["odds_p1", "odds_p2"]:
+        if c not in df.columns:
+            df[c] = 1.90
+    df["odds_p1"] = df["odds_p1"].fillna(1.90)
+    df["odds_p2"] = df["odds_p2"].fillna(1.90)
 
-# Surface default
-if "surface" in df.columns:
-    df["surface"] = df["surface"].fillna("Hard")
-else:
-    df["surface"] = "Hard"
+    # Surface default
+    if "surface" in df.columns:
+        df["surface"] = df["surface"].fillna("Hard")
+    else:
+        df["surface"] = "Hard"
 
-os.makedirs(os.path.dirname(dst), exist_ok=True)
-df.to_csv(dst, index=False)
-print(f"[ok] Fixtures preparados → {dst} ({len(df)} linhas)")
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    df.to_csv(dst, index=False)
+    print(f"[ok] Fixtures preparados → {dst} ({len(df)} linhas)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ from typing import Dict, List, Set, Tuple
 import feedparser
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 KEYWORDS = [
     r"withdraws?", r"withdrawal", r"pulls out", r"retires?", r"retirement",
@@ -26,6 +28,11 @@ HTML_SOURCES = [
     ("tennisexplorer_injured", "https://www.tennisexplorer.com/list-players/injured/"),
 ]
 
+# uma sessão para todos os pedidos (keep-alive: o mesmo host não repete o handshake TLS) + retries em 429/5xx
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(
+    total=3, backoff_factor=1.5, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)))
+
 def _norm_name(s: str) -> str:
     s = (s or "").strip().lower()
     s = re.sub(r"[.\-]+", " ", s)
@@ -43,7 +50,7 @@ def extract_player_names(text: str) -> List[str]:
 def fetch_rss_urls_from_hub(url: str) -> List[str]:
     """Algumas páginas (ex. WTA hub) listam várias RSS; extraímos os links."""
     try:
-        html = requests.get(url, timeout=20).text
+        html = _SESSION.get(url, timeout=20).text
         soup = BeautifulSoup(html, "html.parser")
         feeds = []
         for a in soup.find_all("a", href=True):
@@ -57,7 +64,7 @@ def fetch_rss_urls_from_hub(url: str) -> List[str]:
 def parse_feed(url: str) -> List[Tuple[str,str]]:
     """Devolve lista de (title, link)."""
     try:
-        d = feedparser.parse(url)
+        d = feedparser.parse(_SESSION.get(url, timeout=20).content)
         items = []
         for e in d.entries:
             title = getattr(e, "title", "") or ""
@@ -70,7 +77,7 @@ def parse_feed(url: str) -> List[Tuple[str,str]]:
 def scrape_injured_page(url: str) -> List[str]:
     """Extrai nomes de jogadores listados como injured/retired (Tennis Explorer)."""
     try:
-        html = requests.get(url, timeout=20).text
+        html = _SESSION.get(url, timeout=20).text
         soup = BeautifulSoup(html, "html.parser")
         names = []
         for a in soup.select("table a"):
@@ -0,0 +1,5 @@
+// Tailwind pré-compilado: as classes são lidas das strings HTML/JS dentro do app.py
+module.exports = {
+  content: ["./app.py"],
+  theme: { extend: { colors: { brand: "#0d6efd" } } },
+};
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# scripts/ e app.py não são pacotes: pôr as pastas no path para os testes os importarem
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "scripts"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
@@ -0,0 +1,55 @@
+import pytest
+
+import app
+
+
+def _write(tmp_path, data: bytes):
+    p = tmp_path / "t.csv"
+    p.write_bytes(data)
+    return str(p)
+
+
+SIMPLE = [
+    ("crlf", b"a,b,c\r\n1,2,3\r\n4,5,6\r\n"),
+    ("bom", b"\xef\xbb\xbfa,b\n1,2\n3,4\n"),
+    ("short", b"a,b\n1,2\n"),                      # menos de n linhas
+    ("no_trailing_nl", b"a,b\n1,2\n3,4"),
+    ("ragged", b"a,b,c\n1\n1,2,3,4\n"),
+    ("blank_lines", b"a,b\n1,2\n\n3,4\n\r\n"),
+    ("header_only", b"a,b\n"),
+    ("empty", b""),
+]
+
+QUOTED = [
+    ("quoted_comma", b'a,b\n"x,y",2\n3,4\n'),
+    ("embedded_newline", b'a,b\n"line1\nline2",2\n3,4\n'),
+    ("quoted_crlf", b'a,b\r\n"x\r\ny",2\r\n'),
+]
+
+
+@pytest.mark.parametrize("name,data", SIMPLE, ids=[c[0] for c in SIMPLE])
+@pytest.mark.parametrize("n", [1, 2, 50])
+def test_fast_path_matches_strict(tmp_path, name, data, n):
+    path = _write(tmp_path, data)
+    fast = app._csv_head_fast(path, n)
+    assert fast is not None
+    assert fast == app.read_csv_head(path, n, strict=True)
+
+
+@pytest.mark.parametrize("name,data", QUOTED, ids=[c[0] for c in QUOTED])
+def test_fast_path_declines_quotes(tmp_path, name, data):
+    path = _write(tmp_path, data)
+    assert app._csv_head_fast(path, 50) is None
+    cols, cols_data = app.read_csv_head(path, 50)  # cai no caminho estrito
+    assert (cols, cols_data) == app.read_csv_head(path, 50, strict=True)
+    assert cols == ["a", "b"]
+
+
+def test_fast_path_block_boundary(tmp_path):
+    row = b"1234567890," * 9 + b"x\n"
+    path = _write(tmp_path, b"a" + b",a" * 9 + b"\n" + row * 2000)  # bem mais que 64 KiB
+    fast = app._csv_head_fast(path, 10)
+    assert fast is not None and fast == app.read_csv_head(path, 10, strict=True)
+    assert app._csv_head_fast(path, 1500) is None  # n linhas não cabem no bloco
+    cols, data = app.read_csv_head(path, 1500)
+    assert len(data[0]) == 1500
@@ -0,0 +1,122 @@
+import pytest
+
+import fetch_fixtures_sofascore as ff
+
+EV = ("1", "Wimbledon", "ATP", "", "A", "B", 1700000000)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    p = ff.SofaScoreHTMLProvider()
+    calls = []
+
+    def fake(url, headers, parse):
+        calls.append("api" if parse == p._rows_from_api else "html")
+        return p.responses[calls[-1]]()
+
+    monkeypatch.setattr(p, "_cached_rows", fake)
+    p.calls = calls
+    return p
+
+
+def _blocked():
+    raise RuntimeError("SofaScore HTTP 403")
+
+
+def test_api_with_events(provider):
+    provider.responses = {"api": lambda: [EV], "html": lambda: [EV, EV]}
+    assert len(provider.fetch_day("2025-07-01")) == 1
+    assert provider.calls == ["api"] and provider.sources["2025-07-01"] == "api"
+
+
+def test_empty_api_falls_back_to_html(provider):
+    # 200 sem eventos (soft-block / esquema novo) não pode dar um dia vazio em silêncio
+    provider.responses = {"api": lambda: [], "html": lambda: [EV]}
+    rows = provider.fetch_day("2025-07-01")
+    assert rows == [ff.norm_row("2025-07-01", *EV)]
+    assert provider.calls == ["api", "html"]
+    assert provider.sources["2025-07-01"] == "api vazia → html"
+
+
+def test_blocked_api_falls_back_to_html(provider):
+    provider.responses = {"api": _blocked, "html": lambda: [EV]}
+    assert len(provider.fetch_day("2025-07-01")) == 1
+    assert provider.sources["2025-07-01"].endswith("→ html")
+    assert "403" in provider.sources["2025-07-01"]
+
+
+def test_both_fail_raises(provider):
+    provider.responses = {"api": lambda: [], "html": _blocked}
+    with pytest.raises(RuntimeError):
+        provider.fetch_day("2025-07-01")
+
+
+class _Resp:
+    def __init__(self, status, body):
+        self.status_code, self.content = status, body
+
+
+class _Browser(Exception):
+    pass
+
+
+def _pw_provider(resp):
+    # sem Playwright instalado: só o caminho da API direta, o browser é um sentinela
+    p = object.__new__(ff.SofaScorePlaywrightProvider)
+    p.session = type("S", (), {"get": lambda self, url, timeout: resp})()
+    p.sources = {}
+
+    def no_browser():
+        raise _Browser
+    p._context = no_browser
+    return p
+
+
+def test_playwright_api_direct_with_events():
+    body = b'{"events":[{"id":1,"tournament":{"name":"T"},"homeTeam":{"name":"A"},"awayTeam":{"name":"B"}}]}'
+    p = _pw_provider(_Resp(200, body))
+    rows = p.fetch_day("2025-07-01")
+    assert [r[1] for r in rows] == [1] and p.sources["2025-07-01"] == "api direta"
+
+
+@pytest.mark.parametrize("resp", [_Resp(200, b'{"events":[]}'), _Resp(200, b"{}"), _Resp(403, b"")])
+def test_playwright_empty_api_goes_to_browser(resp):
+    with pytest.raises(_Browser):
+        _pw_provider(resp).fetch_day("2025-07-01")
+
+
+def _dfs_ref(obj):
+    """a DFS recursiva original (ordem de referência)"""
+    out = []
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if k == "events" and isinstance(v, list):
+                out.extend(v)
+            else:
+                out.extend(_dfs_ref(v))
+    elif isinstance(obj, list):
+        for it in obj:
+            out.extend(_dfs_ref(it))
+    return out
+
+
+def _ev(i, home):
+    return {"id": i, "homeTeam": {"name": home}, "awayTeam": {"name": "x"}}
+
+
+def test_harvest_keeps_recursive_order():
+    blob = {"props": {
+        "a": {"events": [_ev(1, "a1"), _ev(2, "a2")]},
+        "events": [_ev(3, "top"), _ev(1, "dup-top")],   # depois de "a", antes de "b"
+        "b": [{"x": {"events": [_ev(4, "b4")]}}, {"events": [_ev(2, "dup-b"), _ev(5, "b5")]}],
+        "c": {"events": {"not": "a list"}, "d": {"events": [_ev(6, "d6")]}},
+    }}
+    p = ff.SofaScoreHTMLProvider()
+    rows = p._harvest_events_from_blob(blob)
+    assert [r[0] for r in rows] == [1, 2, 3, 4, 5, 6]
+    assert [r[4] for r in rows] == ["a1", "a2", "top", "b4", "b5", "d6"]  # a primeira ocorrência ganha
+    ref_ids = []
+    for ev in _dfs_ref(blob):
+        if ev["id"] not in ref_ids:
+            ref_ids.append(ev["id"])
+    assert [r[0] for r in rows] == ref_ids
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+import filter_tips as ft
+
+
+def _news(tmp_path, rows):
+    p = tmp_path / "news.csv"
+    pd.DataFrame(rows, columns=["player", "status", "severity", "date"]).to_csv(p, index=False)
+    return ft.load_news(str(p))
+
+
+def test_severity_series_matches_parse_severity(tmp_path):
+    rows = [
+        ("a", "withdrew after injury", "", "2025-01-01"),      # withdrew vem antes de injury
+        ("a", "injury, then withdrawal", None, "2025-01-01"),  # withdrawal é a 1.ª chave, não a 1.ª no texto
+        ("b", "Lesão no ombro", "", "2025-01-01"),
+        ("b", "travel fatigue", "", "2025-01-01"),
+        ("c", "COVID", "0.3", "2025-01-01"),                   # severity numérica ganha ao status
+        ("c", "retired", "1.5", "2025-01-01"),                 # fora de [0,1] → status
+        ("c", "flu", "-0.2", "2025-01-01"),
+        ("d", "illness", "abc", "2025-01-01"),
+        ("d", "", " 0.7 ", "2025-01-01"),
+        ("d", None, None, "2025-01-01"),                       # nada → default
+        ("e", "doubtful", "1", "2025-01-01"),
+        ("e", "jetlag", "0", "2025-01-01"),
+    ]
+    df = _news(tmp_path, rows)
+    got = ft.severity_series(df)
+    want = [ft.parse_severity({"status": str(r["status"]), "severity": str(r["severity"])})
+            for _, r in df.iterrows()]
+    np.testing.assert_array_equal(got, want)
+    assert got[0] == got[1] == 1.0
+    assert got[2] == ft.STATUS_SEVERITY["lesão"]
+    assert got[3] == ft.STATUS_SEVERITY["fatigue"]
+    assert got[9] == ft.DEFAULT_SEVERITY
+
+
+def test_severity_series_in_memory_frame():
+    df = pd.DataFrame({"status": ["retired", np.nan, "withdrawal"], "severity": [np.nan, 0.25, 2.0]})
+    got = ft.severity_series(df)
+    want = [ft.parse_severity({"status": str(s), "severity": str(v)}) for s, v in zip(df["status"], df["severity"])]
+    np.testing.assert_array_equal(got, want)
+
+
+def _risk_ref(name, base_ts, df, hl):
+    """versão linha a linha (a antiga): primeiro risco estritamente maior ganha"""
+    rel = df[df["player_norm"] == str(name).strip().lower()]
+    best, tag = 0.0, ""
+    for _, r in rel.iterrows():
+        dt = r["date_dt"]
+        days = 0.0 if pd.isna(dt) else max(0.0, (base_ts - dt.timestamp()) / 86400.0)
+        sev = ft.parse_severity({"status": str(r["status"]), "severity": str(r["severity"])})
+        risk = sev * ft.half_life_decay(days, hl)
+        if risk > best:
+            best, tag = risk, str(r["status"] or "")
+    return best, tag
+
+
+def test_player_risk_decay_and_ties(tmp_path):
+    base = pd.Timestamp("2025-01-15", tz="UTC").timestamp()
+    df = _news(tmp_path, [
+        ("Alpha", "withdrawal", "", "2025-01-08"),   # 7 dias → metade
+        (" alpha ", "injury", "", "2025-01-20"),     # no futuro → 0 dias
+        ("Beta", "withdrawal", "", "2025-01-10"),
+        ("Beta", "withdrew", "", "2025-01-10"),      # empate: fica a primeira
+        ("Gamma", "retired", "", "not a date"),      # sem data → 0 dias
+        ("Delta", "retired", "0", "2025-01-10"),     # risco 0 → sem notícia
+    ])
+    table = ft.build_risk_table(df)
+
+    assert ft.player_risk("ALPHA", base, table, 7.0) == (0.85, "injury")
+    r, tag = ft.player_risk("Beta", base, table, 5.0)
+    assert tag == "withdrawal" and abs(r - 0.5) < 1e-12
+    assert ft.player_risk("gamma", base, table, 7.0) == (0.95, "retired")
+
+    # meia-vida: notícia com 7 dias e hl=7 vale metade
+    only_old = ft.build_risk_table(df.iloc[[0]])
+    r, tag = ft.player_risk("alpha", base, only_old, 7.0)
+    assert tag == "withdrawal" and abs(r - 0.5) < 1e-12
+    r, _ = ft.player_risk("alpha", base, only_old, 0.0)  # hl<=0 desliga o decaimento
+    assert r == 1.0
+
+
+def test_player_risk_no_news(tmp_path):
+    df = _news(tmp_path, [("Delta", "retired", "0", "2025-01-10")])
+    table = ft.build_risk_table(df)
+    base = pd.Timestamp("2025-01-15", tz="UTC").timestamp()
+    assert ft.player_risk("Nobody", base, table, 7.0) == (0.0, "")
+    assert ft.player_risk("", base, table, 7.0) == (0.0, "")
+    assert ft.player_risk("Delta", base, table, 7.0) == (0.0, "")
+    assert ft.player_risk("x", base, {}, 7.0) == (0.0, "")
+
+
+def test_player_risk_matches_row_wise(tmp_path):
+    rng = np.random.default_rng(7)
+    statuses = list(ft.STATUS_SEVERITY) + ["", "doubtful", "withdrew with injury"]
+    rows = [(f"P{rng.integers(6)}", statuses[rng.integers(len(statuses))],
+             rng.choice(["", "0.4", "1", "2", "x"]),
+             (pd.Timestamp("2025-01-01") + pd.Timedelta(hours=int(rng.integers(0, 24 * 30)))).isoformat())
+            for _ in range(120)]
+    df = _news(tmp_path, rows)
+    table = ft.build_risk_table(df)
+    base = pd.Timestamp("2025-01-20", tz="UTC").timestamp()
+    for name in [f"P{i}" for i in range(7)]:
+        r, tag = ft.player_risk(name, base, table, 7.0)
+        r0, tag0 = _risk_ref(name, base, df, 7.0)
+        assert tag == tag0 and abs(r - r0) < 1e-12
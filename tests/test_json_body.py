@@ -0,0 +1,39 @@
+import io
+import json
+
+import pytest
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+import app
+
+
+def _body(data: bytes, chunked: bool = False):
+    if chunked:  # Transfer-Encoding: chunked → sem Content-Length, o servidor termina o stream
+        return app.app.test_request_context(
+            "/", method="POST", input_stream=io.BytesIO(data),
+            headers={"Transfer-Encoding": "chunked"},
+            environ_overrides={"wsgi.input_terminated": True},
+        )
+    return app.app.test_request_context("/", method="POST", data=data)
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_valid_object(chunked):
+    with _body(json.dumps({"a": 1}).encode(), chunked):
+        assert (app.request.content_length is None) == chunked
+        assert app.json_body() == {"a": 1}
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_too_large(chunked):
+    big = json.dumps({"x": "y" * app.MAX_JSON_BYTES}).encode()
+    with _body(big, chunked):
+        with pytest.raises(RequestEntityTooLarge):
+            app.json_body()
+
+
+@pytest.mark.parametrize("data", [b"", b"[1, 2]", b"{nope", b"\xff\xfe"])
+def test_invalid(data):
+    with _body(data, chunked=True):
+        with pytest.raises(BadRequest):
+            app.json_body()
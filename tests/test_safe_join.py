@@ -0,0 +1,62 @@
+import os
+
+import pytest
+from werkzeug.exceptions import BadRequest
+
+import app
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    r = tmp_path / "package"
+    (r / "data").mkdir(parents=True)
+    monkeypatch.setattr(app, "_HERE_STR", str(r))
+    monkeypatch.setattr(app, "_HERE_PREFIX", str(r) + os.sep)
+    return r
+
+
+def test_inside_root(root):
+    assert app.safe_join("data/x.csv") == str(root / "data" / "x.csv")
+    assert app.safe_join("data/../outputs/./t.csv") == str(root / "outputs" / "t.csv")
+
+
+@pytest.mark.parametrize("rel", [
+    "../secret.csv",
+    "data/../../secret.csv",
+    "..",
+    "",                      # a própria raiz não é um ficheiro dentro dela
+    "../package2/x.csv",     # pasta irmã com o mesmo prefixo
+])
+def test_outside_root(root, rel):
+    with pytest.raises(BadRequest):
+        app.safe_join(rel)
+
+
+def test_absolute_paths_rejected(root):
+    for rel in ("/etc/passwd", str(root / "data" / "x.csv"), str(root) + "2/x.csv"):
+        with pytest.raises(BadRequest):
+            app.safe_join(rel)
+
+
+def test_symlinks_not_resolved(root, tmp_path):
+    outside = tmp_path / "elsewhere"
+    outside.mkdir()
+    (outside / "f.csv").write_text("a\n1\n")
+    try:
+        os.symlink(outside, root / "data" / "link", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("sem suporte a symlinks")
+    # o link está dentro da árvore: é aceite e seguido (verificação só léxica)
+    p = app.safe_join("data/link/f.csv")
+    assert p == str(root / "data" / "link" / "f.csv")
+    assert os.path.realpath(p) == str((outside / "f.csv").resolve())
+    # ../ depois do link é resolvido lexicalmente, não a partir do destino
+    assert app.safe_join("data/link/../x.csv") == str(root / "data" / "x.csv")
+
+
+def test_routes_reject_traversal():
+    client = app.app.test_client()
+    assert client.get("/api/preview_csv?path=../../etc/passwd").status_code == 400
+    assert client.get("/api/preview_csv?path=/etc/passwd").status_code == 400
+    assert client.get("/download/%2E%2E/%2E%2E/etc/passwd").status_code == 400
+    assert client.get("/download/..%2F..%2Fetc%2Fpasswd").status_code == 400
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+import app
+
+
+def test_dangling_symlink_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "_HERE_PREFIX", str(tmp_path) + os.sep)
+    root = tmp_path / "outputs"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.csv").write_text("x\n1\n")
+    (root / "sub" / "b.csv").write_text("x\n2\n")
+    try:
+        os.symlink(tmp_path / "missing.csv", root / "broken.csv")
+    except (OSError, NotImplementedError):
+        pytest.skip("sem suporte a symlinks")
+    dir_mtimes, items = app.scan_csv(str(root))
+    assert sorted(name for _, name, _ in items) == ["outputs/a.csv", os.path.join("outputs", "sub", "b.csv")]
+    assert set(dir_mtimes) == {str(root), str(root / "sub")}
@@ -0,0 +1,26 @@
+import json
+import threading
+
+import app
+
+
+def test_concurrent_saves_are_atomic(tmp_path, monkeypatch):
+    target = tmp_path / "configs" / "ui_settings.json"
+    monkeypatch.setattr(app, "SETTINGS_JSON", target)
+    errors = []
+
+    def save(i):
+        try:
+            for j in range(30):
+                app.write_settings({"who": i, "n": j, "pad": "x" * 5000})
+        except Exception as e:  # FileNotFoundError com um .tmp partilhado
+            errors.append(e)
+
+    ts = [threading.Thread(target=save, args=(i,)) for i in range(6)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert not errors
+    assert json.loads(target.read_text())["n"] == 29  # ficheiro inteiro, de uma das gravações
+    assert [p.name for p in target.parent.iterdir()] == ["ui_settings.json"]  # sem temporários
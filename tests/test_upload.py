@@ -0,0 +1,42 @@
+import io
+import tempfile
+
+import app
+
+DATA = b"a,b\n" + b"1,2\n" * 5000
+
+
+def _copy(src, tmp_path):
+    out = tmp_path / "out.csv"
+    with open(out, "wb", buffering=0) as dst:
+        app._copy_upload(src, dst)
+    return out.read_bytes()
+
+
+def test_spooled_in_memory_is_not_rolled_over(tmp_path):
+    src = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+    src.write(DATA)
+    src.seek(0)
+    assert not app._on_disk(src)
+    assert _copy(src, tmp_path) == DATA
+    assert not src._rolled  # nada de fileno() → continua em memória
+
+
+def test_on_disk_streams(tmp_path):
+    rolled = tempfile.SpooledTemporaryFile(max_size=10)
+    rolled.write(DATA)
+    rolled.seek(0)
+    assert rolled._rolled and app._on_disk(rolled)
+    assert _copy(rolled, tmp_path) == DATA
+
+    tmp = tempfile.TemporaryFile("w+b")
+    tmp.write(DATA)
+    tmp.seek(4)  # copia a partir da posição atual
+    assert app._on_disk(tmp)
+    assert _copy(tmp, tmp_path) == DATA[4:]
+
+
+def test_bytesio(tmp_path):
+    src = io.BytesIO(DATA)
+    assert not app._on_disk(src)
+    assert _copy(src, tmp_path) == DATA
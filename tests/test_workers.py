@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+
+import app
+
+SCRIPT = '''
+import logging, os, sys
+COUNT = globals().get("COUNT", 0) + 1
+print("argv", sys.argv[1:], "count", COUNT, "utf8", sys.flags.utf8_mode)
+sys.stdout.flush()
+os.write(1, b"fd1 direto\\n")
+logging.basicConfig()
+logging.getLogger("t").warning("via logging")
+print("olá ção", file=sys.stderr)
+sys.exit(int(sys.argv[1]))
+'''
+
+
+def test_import_does_not_touch_environment():
+    # importar o app (testes, gunicorn, ...) não mexe no ambiente do processo; só os workers o recebem
+    env = {k: v for k, v in os.environ.items() if k not in ("PYTHONUTF8", "PYTHONIOENCODING")}
+    code = "import os; before = dict(os.environ); import app; assert dict(os.environ) == before"
+    subprocess.run([sys.executable, "-c", code], cwd=app._HERE_STR, env=env, check=True)
+    assert app._PROC_ENV["PYTHONUTF8"] == "1" and app._PROC_ENV["PYTHONIOENCODING"] == "utf-8"
+
+
+def test_worker_runs_one_job_per_process(tmp_path):
+    script = tmp_path / "job.py"
+    script.write_text(SCRIPT, encoding="utf-8")
+    w = app.ScriptWorker(str(script))
+
+    r = list(w.run(["3"]))
+    msgs = [m for batch in r for m in batch]
+    assert msgs[-1] == {"event": "end", "code": 3}
+    out = [m["line"] for m in msgs if m["event"] == "log" and m["stream"] == "stdout"]
+    err = [m["line"] for m in msgs if m["event"] == "log" and m["stream"] == "stderr"]
+    assert out == ["argv ['3'] count 1 utf8 1", "fd1 direto"]
+    assert "WARNING:t:via logging" in err and "olá ção" in err
+
+    # processo novo (já quente) por job: globais não passam de um job para o outro
+    assert w._next is not None
+    script.write_text(SCRIPT.replace('"count"', '"n"'), encoding="utf-8")
+    msgs = [m for batch in w.run(["0"]) for m in batch]
+    assert msgs[-1]["code"] == 0
+    assert msgs[0]["line"] == "argv ['0'] n 1 utf8 1"  # código editado entra logo
+
+
+def test_run_cmd_reports_tracebacks(tmp_path):
+    script = tmp_path / "boom.py"
+    script.write_text("raise RuntimeError('falhou')\n", encoding="utf-8")
+    res = app.run_cmd(str(script), [])
+    assert res["code"] == 1
+    assert "RuntimeError: falhou" in res["stderr"]
+
+
+MAIN_SCRIPT = '''
+import sys
+from typing import List, Optional
+print("import", __name__)
+VERSION = 1
+
+def main(argv: Optional[List[str]] = None) -> int:
+    print("main", argv, "v", VERSION)
+    return int(argv[0])
+
+if __name__ == "__main__":
+    sys.exit(main())
+'''
+
+
+def test_worker_calls_main_directly(tmp_path):
+    script = tmp_path / "job_main.py"
+    script.write_text(MAIN_SCRIPT, encoding="utf-8")
+    w = app.ScriptWorker(str(script))
+    msgs = [m for batch in w.run(["2"]) for m in batch]
+    out = [m["line"] for m in msgs if m["event"] == "log"]
+    # importado como módulo (não __main__) antes do job; o job só chama main(argv)
+    assert out == ["import _job_job_main", "main ['2'] v 1"]
+    assert msgs[-1]["code"] == 2
+
+    # o próximo worker já importou a versão antiga: editar antes do job tem de contar
+    script.write_text(MAIN_SCRIPT.replace("VERSION = 1", "VERSION = 2"), encoding="utf-8")
+    os.utime(script, ns=(1, 1))  # mtime diferente mesmo com resolução grosseira do FS
+    msgs = [m for batch in w.run(["0"]) for m in batch]
+    out = [m["line"] for m in msgs if m["event"] == "log"]
+    assert out[-1] == "main ['0'] v 2" and msgs[-1]["code"] == 0
@@ -0,0 +1,10 @@
+// Gera static/app.css (Tailwind purgado + componentes) para o app.py servir em vez do CDN.
+// Uso: node tools/build_css.mjs
+import { spawnSync } from "node:child_process";
+import { fileURLToPath } from "node:url";
+import path from "node:path";
+
+const root = path.resolve(path.dirname(fileURLToPath(import.meta.url)), "..");
+const r = spawnSync("npx", ["--yes", "tailwindcss@3", "-c", "tailwind.config.js",
+  "-i", "tools/tailwind.in.css", "-o", "static/app.css", "--minify"], { cwd: root, stdio: "inherit" });
+process.exit(r.status ?? 1);